@@ -0,0 +1,55 @@
+"""
+Inference package — model prediction logic used by the UI.
+
+`predict` and `predict_batch` keep the return format the UI renders:
+``{"label": "real" | "spoof", "confidence": float, "details": dict}``.
+
+Names are imported lazily, so ``import inference`` does not pull in torch
+until a model-related attribute is first used.
+"""
+
+from __future__ import annotations
+
+import importlib
+
+_EXPORTS = {
+    "BiCrossAttentionFusion": "inference.model",
+    "ClassifierHead": "inference.model",
+    "FullModel": "inference.model",
+    "SpoofDetector": "inference.model",
+    "build_model": "inference.model",
+    "make_vgg17": "inference.model",
+    "Preprocess": "inference.preprocess",
+    "compare_highpass_engines": "inference.preprocess",
+    "fft_highpass_batch": "inference.preprocess",
+    "fft_highpass_preprocess": "inference.preprocess",
+    "auto_batch_size": "inference.predictor",
+    "get_backend": "inference.predictor",
+    "get_detector": "inference.predictor",
+    "iter_predict": "inference.predictor",
+    "predict": "inference.predictor",
+    "predict_batch": "inference.predictor",
+    "result_cache": "inference.predictor",
+    "warmup": "inference.predictor",
+    "ModelLoader": "inference.runtime",
+    "build_backend": "inference.backends",
+    "benchmark_cpu_modes": "inference.cpu_mode",
+    "benchmark_branch_strategies": "inference.branches",
+    "compare_fusion_modes": "inference.fusion",
+    "evaluate_cascade": "inference.cascade",
+    "pipelined_batches": "inference.pipeline",
+    "quantize_detector": "inference.quantize",
+    "ResultCache": "inference.cache",
+    "ResultStore": "inference.store",
+    "MicroBatcher": "inference.server",
+    "RemoteClient": "inference.client",
+    "batch_profiler": "inference.profiling",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,58 @@
+"""
+Command-line entry point: ``python -m inference <command>``.
+
+    scan        predict images in directories / globs, streaming JSONL
+                (see `inference.scan`)
+    serve       local HTTP service with micro-batching (see `inference.server`)
+    bench       stage-level micro-benchmarks on synthetic images
+                (see `inference.bench`)
+    quantize    build the INT8 detector for the int8 backend
+                (see `inference.quantize`)
+    checkpoint  convert a training checkpoint to a tensors-only file
+                (see `inference.checkpoint`)
+    fusion      accuracy / speed report for the pooled fusion modes
+                (see `inference.fusion`)
+    cascade     train the cascade probe and report early-exit rates
+                (see `inference.cascade`)
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from inference import bench, cascade, checkpoint, fusion, quantize, scan, server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m inference")
+    commands = parser.add_subparsers(dest="command", required=True)
+    scan.add_arguments(commands.add_parser("scan", help="scan images and write JSONL results"))
+    server.add_arguments(commands.add_parser("serve", help="run the HTTP inference service"))
+    bench.add_arguments(commands.add_parser("bench", help="benchmark each pipeline stage"))
+    quantize.add_arguments(commands.add_parser("quantize", help="build the INT8 quantized detector"))
+    checkpoint.add_arguments(
+        commands.add_parser("checkpoint", help="convert a checkpoint to tensors-only")
+    )
+    fusion.add_arguments(commands.add_parser("fusion", help="compare the pooled fusion modes"))
+    cascade.add_arguments(
+        commands.add_parser("cascade", help="measure (and train) the cascade screener")
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    modules = {
+        "scan": scan,
+        "serve": server,
+        "bench": bench,
+        "quantize": quantize,
+        "checkpoint": checkpoint,
+        "fusion": fusion,
+        "cascade": cascade,
+    }
+    return modules[args.command].run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
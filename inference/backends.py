@@ -0,0 +1,248 @@
+"""
+Pluggable inference backends behind `predict` / `predict_batch`.
+
+Every backend maps a uint8 (N,224,224,3) tensor to (N,2) logits:
+
+    eager        the `SpoofDetector` module as-is
+    torchscript  `torch.jit.trace` of the detector, preprocessing included
+    compile      `torch.compile` of the detector (inductor)
+    onnx         `FullModel` exported to ONNX with a dynamic batch axis and
+                 run on ONNX Runtime CPU; `Preprocess` stays in torch
+                 (needs the optional ``onnxruntime`` package)
+    int8         the INT8 quantized detector built offline by
+                 ``python -m inference quantize`` (see `inference.quantize`)
+
+Compiled artifacts are cached on disk under `ARTIFACT_DIR`, keyed by the
+model fingerprint, so only the first start after a checkpoint change pays
+for tracing or export. They are written to a temporary file and renamed
+into place, so processes starting together never load a half-written
+artifact. Each non-eager backend is checked against eager at
+startup and replaced by eager if the outputs disagree. Lossy backends
+(int8, bf16 autocast) get a looser tolerance and their own result-cache namespace.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+import torch
+from torch.nn import functional as F
+
+from inference.branches import branch_strategy
+from inference.config import ARTIFACT_DIR, device
+from inference.cpu_mode import AutocastBackend
+from inference.model import SpoofDetector
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("eager", "torchscript", "compile", "onnx", "int8")
+
+# Backends whose predictions legitimately differ from fp32 eager.
+LOSSY_BACKENDS = ("int8",)
+
+# Backends that honour CPU bf16 autocast; traced and exported graphs are
+# fixed at fp32.
+AUTOCAST_BACKENDS = ("eager", "compile")
+
+# Max |softmax difference| tolerated by the startup parity check. The int8
+# bound only catches a broken artifact; its accuracy is measured on real
+# images by `inference.quantize`.
+PARITY_TOLERANCE = 1e-3
+LOSSY_PARITY_TOLERANCE = 0.1
+
+
+class EagerBackend:
+    name = "eager"
+
+    def __init__(self, detector: SpoofDetector):
+        self.detector = detector
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return self.detector(x)
+
+
+class TorchScriptBackend:
+    name = "torchscript"
+
+    def __init__(self, detector: SpoofDetector, artifact: Path):
+        if artifact.exists():
+            self.module = torch.jit.load(str(artifact), map_location=device)
+        else:
+            example = _example_input(2)
+            with torch.no_grad():
+                self.module = torch.jit.trace(detector, example, check_trace=False)
+            write_atomic(artifact, self.module.save)
+        self.module = torch.jit.optimize_for_inference(torch.jit.freeze(self.module.eval()))
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return self.module(x)
+
+
+class CompileBackend:
+    name = "compile"
+
+    def __init__(self, detector: SpoofDetector, cache_dir: Path):
+        # inductor reads its kernel cache location from the environment when
+        # it first compiles; keep it next to the other artifacts unless the
+        # user already chose one.
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir.resolve()))
+        self.module = torch.compile(detector, dynamic=True)
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return self.module(x)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, detector: SpoofDetector, artifact: Path):
+        import onnxruntime as ort
+
+        self.preprocess = detector.preprocess
+        if not artifact.exists():
+            x_rgb, x_fft = self.preprocess(_example_input(2))
+            write_atomic(
+                artifact,
+                lambda path: torch.onnx.export(
+                    detector.model,
+                    (x_rgb, x_fft),
+                    path,
+                    input_names=["x_rgb", "x_fft"],
+                    output_names=["logits"],
+                    dynamic_axes={
+                        "x_rgb": {0: "batch"},
+                        "x_fft": {0: "batch"},
+                        "logits": {0: "batch"},
+                    },
+                    opset_version=17,
+                    dynamo=False,
+                ),
+            )
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = torch.get_num_threads()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(artifact), options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        x_rgb, x_fft = self.preprocess(x)
+        (logits,) = self.session.run(
+            None,
+            {
+                "x_rgb": x_rgb.contiguous().numpy(),
+                "x_fft": x_fft.contiguous().numpy(),
+            },
+        )
+        return torch.from_numpy(logits)
+
+
+class Int8Backend:
+    name = "int8"
+
+    def __init__(self, artifact: Path):
+        if not artifact.exists():
+            raise FileNotFoundError(
+                f"{artifact} not found; build it with "
+                "`python -m inference quantize --calibration <dir>`"
+            )
+        torch.backends.quantized.engine = "x86"
+        self.module = torch.jit.load(str(artifact), map_location=device).eval()
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return self.module(x)
+
+
+def write_atomic(path: Path, write: Callable[[str], object]):
+    """
+    Call ``write(tmp)`` on a temporary file next to `path`, then rename it
+    to `path`; readers see either no file or a complete one.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        os.chmod(tmp, 0o644)  # mkstemp creates it owner-only
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def int8_artifact(fingerprint: str) -> Path:
+    """Where the quantized detector for `fingerprint` is saved."""
+    return Path(ARTIFACT_DIR) / f"{fingerprint}.int8.pt"
+
+
+def build_backend(name: str, detector: SpoofDetector, fingerprint: str, cpu_mode: str = "fp32"):
+    """
+    Build backend `name` for `detector`, verify it against eager and fall
+    back to eager if it cannot be built or does not match.
+
+    With ``cpu_mode="bf16"`` the eager and compile backends run under bf16
+    autocast (see `inference.cpu_mode`); the parity check then uses the
+    lossy tolerance.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}; expected one of {BACKENDS}")
+    eager = EagerBackend(detector)
+    bf16 = cpu_mode == "bf16" and name in AUTOCAST_BACKENDS
+    if name == "eager" and not bf16:
+        return eager
+
+    artifact_dir = Path(ARTIFACT_DIR)
+    try:
+        if name == "eager":
+            backend = eager
+        elif name == "torchscript":
+            # Only a traced fork changes the graph.
+            variant = ".fork" if branch_strategy(detector.model) == "fork" else ""
+            backend = TorchScriptBackend(
+                detector, artifact_dir / f"{fingerprint}{variant}.torchscript.pt"
+            )
+        elif name == "compile":
+            backend = CompileBackend(detector, artifact_dir / "inductor")
+        elif name == "int8":
+            backend = Int8Backend(int8_artifact(fingerprint))
+        else:
+            backend = OnnxBackend(detector, artifact_dir / f"{fingerprint}.onnx")
+        if bf16:
+            backend = AutocastBackend(backend)
+        diff = parity_check(backend, eager)
+    except Exception:
+        logger.exception("Could not build the %s backend; using eager", name)
+        return eager
+
+    lossy = bf16 or name in LOSSY_BACKENDS
+    tolerance = LOSSY_PARITY_TOLERANCE if lossy else PARITY_TOLERANCE
+    if diff > tolerance:
+        logger.warning(
+            "%s backend differs from eager by %.2e (> %.0e); using eager",
+            name, diff, tolerance,
+        )
+        return eager
+    logger.info("Using %s backend (parity diff %.2e)", backend.name, diff)
+    return backend
+
+
+def parity_check(backend, reference, batch_sizes=(1, 3)) -> float:
+    """Max |softmax difference| between two backends on random inputs."""
+    generator = torch.Generator().manual_seed(0)
+    worst = 0.0
+    with torch.no_grad():
+        for n in batch_sizes:
+            x = torch.randint(0, 256, (n, 224, 224, 3), dtype=torch.uint8, generator=generator)
+            p = F.softmax(backend(x).float(), dim=1)
+            q = F.softmax(reference(x).float(), dim=1)
+            worst = max(worst, (p - q).abs().max().item())
+    return worst
+
+
+def _example_input(n: int) -> torch.Tensor:
+    generator = torch.Generator().manual_seed(0)
+    return torch.randint(0, 256, (n, 224, 224, 3), dtype=torch.uint8, generator=generator)
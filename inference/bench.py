@@ -0,0 +1,235 @@
+"""
+Stage-level micro-benchmarks: ``python -m inference bench -o bench.json``.
+
+Times each stage of the prediction path on its own, on synthetic images,
+so a regression can be traced to the stage that caused it:
+
+    per image   read (bytes from disk), decode (`decode_image`),
+                resize (`to_model_input`)
+    per batch   fft (grayscale + high-pass log-magnitude), normalize,
+                vgg_rgb, vgg_fft, fusion, head, softmax, and their total
+
+Image stages run over several sizes and formats. Batch stages run over
+every combination of batch size and torch thread count. Each row
+reports p50/p95/p99/mean latency in ms and throughput in images/s. The
+JSON output also records the torch version, CPU count and git commit,
+so runs from two commits can be diffed directly.
+
+Everything runs on CPU from generated data. Without a local checkpoint
+the model is randomly initialized; weights do not change the timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+import torch
+from PIL import Image
+
+from inference.decode import decode_image, to_model_input
+
+logger = logging.getLogger(__name__)
+
+SIZES = ((640, 480), (1920, 1080), (4000, 3000))
+FORMATS = ("JPEG", "PNG", "WEBP")
+BATCH_SIZES = (1, 8)
+THREADS = tuple(sorted({1, os.cpu_count() or 1}))
+
+
+def synthetic_image(size: tuple[int, int], fmt: str, seed: int = 0) -> bytes:
+    """Encoded image with gradients, blocks and noise, so codecs do real work."""
+    width, height = size
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    img = np.stack(
+        [x / width * 255, y / height * 255, (x + y) / (width + height) * 255], axis=-1
+    )
+    for _ in range(8):
+        x0, y0 = rng.integers(0, width), rng.integers(0, height)
+        img[y0 : y0 + height // 6, x0 : x0 + width // 6] = rng.integers(0, 256, 3)
+    img += rng.normal(0, 12, img.shape)
+    buf = BytesIO()
+    Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)).save(buf, format=fmt, quality=90)
+    return buf.getvalue()
+
+
+def summarize(samples_ms: Sequence[float], images: int = 1) -> dict:
+    """Latency percentiles of `samples_ms` and throughput for `images` per sample."""
+    samples = np.asarray(samples_ms)
+    mean = float(samples.mean())
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": mean,
+        "images_per_second": images * 1000 / mean if mean else 0.0,
+        "samples": len(samples),
+    }
+
+
+def _time(fn: Callable[[], object], repeats: int, warmup: int = 2) -> tuple[list[float], object]:
+    for _ in range(warmup):
+        out = fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, out
+
+
+def bench_image_stages(
+    workdir: Path,
+    sizes: Sequence[tuple[int, int]] = SIZES,
+    formats: Sequence[str] = FORMATS,
+    repeats: int = 10,
+) -> list[dict]:
+    """read / decode / resize rows, one set per (format, size)."""
+    rows = []
+    for fmt in formats:
+        for size in sizes:
+            path = workdir / f"{size[0]}x{size[1]}.{fmt.lower()}"
+            path.write_bytes(synthetic_image(size, fmt))
+            read, data = _time(path.read_bytes, repeats)
+            decode, img = _time(lambda: decode_image(data), repeats)
+            resize, _ = _time(lambda: to_model_input(img), repeats)
+            for stage, samples in (("read", read), ("decode", decode), ("resize", resize)):
+                rows.append(
+                    {"stage": stage, "format": fmt, "size": f"{size[0]}x{size[1]}",
+                     "bytes": len(data), **summarize(samples)}
+                )
+    return rows
+
+
+def bench_model_stages(
+    batch_sizes: Sequence[int] = BATCH_SIZES,
+    threads: Sequence[int] = THREADS,
+    repeats: int = 10,
+) -> list[dict]:
+    """fft ... softmax rows, one set per (threads, batch size)."""
+    from inference.preprocess import Preprocess
+
+    model = _load_model()
+    preprocess = Preprocess(size=224, r=8)
+    rgb = to_model_input(decode_image(synthetic_image((640, 480), "JPEG")))
+
+    rows = []
+    default_threads = torch.get_num_threads()
+    try:
+        for n_threads in threads:
+            torch.set_num_threads(n_threads)
+            for n in batch_sizes:
+                x = torch.from_numpy(np.stack([rgb] * n)).permute(0, 3, 1, 2)
+                stages = {}
+                with torch.no_grad():
+                    stages["fft"], hp = _time(lambda: preprocess.highpass(x), repeats)
+                    stages["normalize"], (x_rgb, x_fft) = _time(
+                        lambda: preprocess.normalize(x, hp), repeats
+                    )
+                    stages["vgg_rgb"], f_rgb = _time(lambda: model.vgg_rgb(x_rgb), repeats)
+                    stages["vgg_fft"], f_fft = _time(lambda: model.vgg_fft(x_fft), repeats)
+                    stages["fusion"], z = _time(lambda: model.fusion(f_rgb, f_fft), repeats)
+                    stages["head"], logits = _time(lambda: model.head(z), repeats)
+                    stages["softmax"], _ = _time(lambda: torch.softmax(logits, dim=1), repeats)
+                stages["total"] = list(np.sum(list(stages.values()), axis=0))
+                for stage, samples in stages.items():
+                    rows.append(
+                        {"stage": stage, "batch_size": n, "threads": n_threads,
+                         **summarize(samples, images=n)}
+                    )
+    finally:
+        torch.set_num_threads(default_threads)
+    return rows
+
+
+def _load_model():
+    from inference.checkpoint import load_model
+    from inference.model import build_model
+
+    try:
+        return load_model()
+    except FileNotFoundError:
+        logger.warning("No checkpoint found; benchmarking a randomly initialized model")
+        return build_model(pretrained=False).eval()
+
+
+def run_suite(
+    sizes: Sequence[tuple[int, int]] = SIZES,
+    formats: Sequence[str] = FORMATS,
+    batch_sizes: Sequence[int] = BATCH_SIZES,
+    threads: Sequence[int] = THREADS,
+    repeats: int = 10,
+) -> dict:
+    """Run every stage benchmark and return the machine-readable report."""
+    with tempfile.TemporaryDirectory(prefix="spoof-bench-") as workdir:
+        image_rows = bench_image_stages(Path(workdir), sizes, formats, repeats)
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "git_commit": _git_commit(),
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeats": repeats,
+        },
+        "image_stages": image_rows,
+        "model_stages": bench_model_stages(batch_sizes, threads, repeats),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ints(value: str) -> tuple[int, ...]:
+    return tuple(int(v) for v in value.split(",") if v)
+
+
+def _sizes(value: str) -> tuple[tuple[int, int], ...]:
+    return tuple(tuple(int(d) for d in v.split("x")) for v in value.split(",") if v)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("-o", "--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--sizes", type=_sizes, default=SIZES, help="e.g. 640x480,4000x3000")
+    parser.add_argument("--formats", type=lambda v: tuple(v.upper().split(",")), default=FORMATS)
+    parser.add_argument("--batch-sizes", type=_ints, default=BATCH_SIZES, help="e.g. 1,8,32")
+    parser.add_argument("--threads", type=_ints, default=THREADS, help="torch thread counts, e.g. 1,4")
+    parser.add_argument("--repeats", type=int, default=10)
+
+
+def run(args: argparse.Namespace) -> int:
+    report = run_suite(args.sizes, args.formats, args.batch_sizes, args.threads, args.repeats)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    for row in report["model_stages"]:
+        if row["stage"] == "total":
+            logger.info(
+                "batch %d, %d threads: p50 %.1f ms, %.2f images/s",
+                row["batch_size"], row["threads"], row["p50_ms"], row["images_per_second"],
+            )
+    return 0
@@ -0,0 +1,169 @@
+"""
+Concurrent execution of the RGB and FFT VGG trunks.
+
+The two trunks are independent until `BiCrossAttentionFusion`, and at
+batch size 1 neither conv stack keeps all cores busy. Strategies:
+
+    sequential  vgg_rgb then vgg_fft (the original `FullModel.forward`)
+    fork        vgg_fft as a `torch.jit.fork` task. Eager mode runs forks
+                inline, so this only overlaps the branches once traced:
+                use it with the torchscript backend, where the fork runs
+                on the inter-op thread pool.
+    threads     vgg_fft on a helper thread while the caller runs vgg_rgb,
+                each with half of the intra-op threads. Works with the
+                eager backend, including bf16 autocast.
+
+The "threads" budget is split once, when the model is built: the
+process-wide intra-op thread count is halved, and the helper thread is
+started with the same count. Everything else in the process then runs
+with half the threads too, which is one reason the strategy is opt-in.
+Neither concurrent strategy has been benchmarked on many-core hosts, so
+"sequential" stays the default; `benchmark_branch_strategies` measures
+each against it.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+import torch
+import torch.nn as nn
+
+from inference.model import FullModel
+
+BRANCH_STRATEGIES = ("sequential", "fork", "threads")
+
+
+class ConcurrentFullModel(FullModel):
+    """`FullModel` sharing `model`'s submodules, with concurrent trunks."""
+
+    def __init__(self, model: FullModel, strategy: str):
+        if strategy not in BRANCH_STRATEGIES:
+            raise ValueError(
+                f"Unknown branch strategy {strategy!r}; expected one of {BRANCH_STRATEGIES}"
+            )
+        super().__init__(model.vgg_rgb, model.vgg_fft, model.fusion, model.head)
+        self.strategy = strategy
+        if strategy == "threads":
+            _split_thread_budget()
+
+    def forward(self, x_rgb, x_fft):
+        if self.strategy == "fork":
+            future = torch.jit.fork(self.vgg_fft, x_fft)
+            f_rgb = self.vgg_rgb(x_rgb)
+            f_fft = torch.jit.wait(future)
+        elif self.strategy == "threads" and not torch.jit.is_tracing():
+            f_rgb, f_fft = self._run_threads(x_rgb, x_fft)
+        else:
+            f_rgb = self.vgg_rgb(x_rgb)
+            f_fft = self.vgg_fft(x_fft)
+        Z = self.fusion(f_rgb, f_fft)
+        return self.head(Z)
+
+    def _run_threads(self, x_rgb, x_fft):
+        # Grad mode and autocast are thread-local; carry them over.
+        grad = torch.is_grad_enabled()
+        autocast = torch.is_autocast_enabled("cpu")
+        dtype = torch.get_autocast_dtype("cpu")
+
+        def fft_branch():
+            with torch.set_grad_enabled(grad), torch.autocast("cpu", dtype=dtype, enabled=autocast):
+                return self.vgg_fft(x_fft)
+
+        # The context carries the stage-timing dict (`inference.metrics`).
+        future = _branch_pool().submit(contextvars.copy_context().run, fft_branch)
+        f_rgb = self.vgg_rgb(x_rgb)
+        f_fft = future.result()
+        return f_rgb, f_fft
+
+
+@functools.lru_cache(maxsize=None)
+def _split_thread_budget() -> int:
+    """Halve the intra-op thread count, once per process; returns the half."""
+    half = max(1, torch.get_num_threads() // 2)
+    torch.set_num_threads(half)
+    return half
+
+
+@functools.lru_cache(maxsize=None)
+def _branch_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=1,
+        thread_name_prefix="vgg-fft",
+        initializer=torch.set_num_threads,
+        initargs=(_split_thread_budget(),),
+    )
+
+
+def with_branch_strategy(model: FullModel, strategy: str) -> nn.Module:
+    """`model` itself for "sequential", else a concurrent view of it."""
+    if strategy == "sequential":
+        return model
+    return ConcurrentFullModel(model, strategy)
+
+
+def branch_strategy(model: nn.Module) -> str:
+    return getattr(model, "strategy", "sequential")
+
+
+def benchmark_branch_strategies(
+    batch_sizes: Sequence[int] = (1, 4),
+    repeats: int = 10,
+) -> dict[str, dict[int, float]]:
+    """
+    Median latency (ms per batch) of the detector for each strategy:
+    "sequential" and "threads" in eager mode, and "fork" against
+    "sequential" once traced (reported as "traced_sequential" and "fork").
+
+    "threads" runs last, since building it halves the process's intra-op
+    threads; the original count is restored afterwards.
+    """
+    from inference.checkpoint import load_model
+    from inference.model import SpoofDetector
+    from inference.preprocess import Preprocess
+
+    generator = torch.Generator().manual_seed(0)
+    inputs = {
+        n: torch.randint(0, 256, (n, 224, 224, 3), dtype=torch.uint8, generator=generator)
+        for n in batch_sizes
+    }
+    model = load_model()
+    preprocess = Preprocess(size=224, r=8)
+
+    def detector(strategy):
+        return SpoofDetector(preprocess, with_branch_strategy(model, strategy)).eval()
+
+    def traced(strategy):
+        with torch.no_grad():
+            module = torch.jit.trace(detector(strategy), inputs[batch_sizes[0]], check_trace=False)
+        return torch.jit.optimize_for_inference(torch.jit.freeze(module.eval()))
+
+    builds = {
+        "sequential": lambda: detector("sequential"),
+        "traced_sequential": lambda: traced("sequential"),
+        "fork": lambda: traced("fork"),
+        "threads": lambda: detector("threads"),
+    }
+    threads = torch.get_num_threads()
+    report = {}
+    try:
+        with torch.no_grad():
+            for name, build in builds.items():
+                run = build()
+                report[name] = {}
+                for n, x in inputs.items():
+                    run(x)  # warm-up
+                    samples = []
+                    for _ in range(repeats):
+                        start = time.perf_counter()
+                        run(x)
+                        samples.append((time.perf_counter() - start) * 1000)
+                    report[name][n] = sorted(samples)[len(samples) // 2]
+    finally:
+        torch.set_num_threads(threads)
+        _split_thread_budget.cache_clear()
+    return report
@@ -0,0 +1,84 @@
+"""
+In-process LRU cache of prediction results keyed by image content.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data: bytes) -> str:
+    """Fast 128-bit hash of raw image bytes."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def copy_result(result: dict) -> dict:
+    """Copy of a result dict with its own ``details`` (and ``timings_ms``)."""
+    details = {
+        key: dict(value) if isinstance(value, dict) else value
+        for key, value in result.get("details", {}).items()
+    }
+    return {**result, "details": details}
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of result dicts, bounded by entry count and total size.
+
+    Sizes are approximated from each result's repr, which is plenty for
+    the small label/confidence/details dicts stored here.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy_result(entry[0])
+
+    def put(self, key: str, result: dict):
+        result = copy_result(result)
+        size = len(key) + len(repr(result))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
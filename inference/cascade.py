@@ -0,0 +1,307 @@
+"""
+Confidence-gated cascade: a cheap screener first, the full model only
+when the screener is unsure.
+
+Screeners map a uint8 (N,224,224,3) tensor to (N,2) logits, like a backend:
+
+    downscale   the same detector on the image resized to `size` (112 by
+                default): a quarter of the VGG work and 1/16 of the
+                attention. Needs nothing beyond the checkpoint.
+    rgb_probe   `vgg_rgb` alone with a linear probe on its pooled features.
+                The probe is trained on a labeled folder and saved next to
+                the compiled artifacts:
+
+                    python -m inference cascade data/val --train-probe data/train
+
+Images whose screener confidence reaches the threshold keep the screener's
+answer (``details["decided_by"] == "screen"``). The rest are re-run through
+the full backend (``"full"``). Tune the threshold with the report printed
+by ``python -m inference cascade <folder>``, which gives the early-exit
+rate, accuracy and estimated cost at each threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Sequence
+
+import torch
+import torch.nn as nn
+from torch.nn import functional as F
+
+from inference.config import ARTIFACT_DIR, CASCADE, CASCADE_SIZE
+from inference.metrics import record, suspend_timings
+from inference.model import SpoofDetector
+from inference.preprocess import Preprocess
+
+logger = logging.getLogger(__name__)
+
+SCREENERS = ("downscale", "rgb_probe")
+THRESHOLDS = (0.8, 0.9, 0.95, 0.98, 0.99)
+
+
+class DownscaleScreener(nn.Module):
+    """`detector`'s model on a `size` x `size` copy of the input."""
+
+    def __init__(self, detector: SpoofDetector, size: int = 112):
+        super().__init__()
+        self.size = size
+        # Same high-pass cutoff relative to the spectrum as at 224.
+        preprocess = detector.preprocess
+        r = max(1, round(preprocess.r * size / preprocess.size))
+        self.detector = SpoofDetector(
+            Preprocess(size=size, r=r, eps=preprocess.eps, engine=preprocess.engine),
+            detector.model,
+        )
+
+    def forward(self, x):
+        small = F.interpolate(
+            x.permute(0, 3, 1, 2).to(torch.float32),
+            size=(self.size, self.size),
+            mode="bilinear",
+            antialias=True,
+            align_corners=False,
+        )
+        small = small.round().clamp(0, 255).to(torch.uint8).permute(0, 2, 3, 1)
+        return self.detector(small)
+
+
+class RgbProbe(nn.Module):
+    """Standardized pooled `vgg_rgb` features -> logits."""
+
+    def __init__(self, in_dim: int = 256, num_classes: int = 2):
+        super().__init__()
+        self.register_buffer("mean", torch.zeros(in_dim))
+        self.register_buffer("std", torch.ones(in_dim))
+        self.linear = nn.Linear(in_dim, num_classes)
+
+    def forward(self, features):
+        return self.linear((features - self.mean) / self.std)
+
+    def fit(self, features: torch.Tensor, labels: torch.Tensor, weight_decay: float = 1e-3):
+        """L2-regularized logistic regression (L-BFGS) on `features`."""
+        self.mean.copy_(features.mean(dim=0))
+        self.std.copy_(features.std(dim=0).clamp_min(1e-6))
+        optimizer = torch.optim.LBFGS(
+            self.linear.parameters(), max_iter=500, line_search_fn="strong_wolfe"
+        )
+
+        def closure():
+            optimizer.zero_grad()
+            loss = F.cross_entropy(self(features), labels)
+            loss = loss + weight_decay * self.linear.weight.pow(2).sum()
+            loss.backward()
+            return loss
+
+        optimizer.step(closure)
+        return self
+
+
+class RgbProbeScreener(nn.Module):
+    """`vgg_rgb` plus an `RgbProbe`; skips the FFT branch and the fusion."""
+
+    def __init__(self, detector: SpoofDetector, probe: RgbProbe):
+        super().__init__()
+        self.preprocess = detector.preprocess
+        self.vgg_rgb = detector.model.vgg_rgb
+        self.probe = probe
+
+    def features(self, x):
+        x_rgb = x.permute(0, 3, 1, 2).to(torch.float32) / 255.0
+        x_rgb = (x_rgb - self.preprocess.mean) / self.preprocess.std
+        return self.vgg_rgb(x_rgb).mean(dim=(2, 3))  # (N,256)
+
+    def forward(self, x):
+        return self.probe(self.features(x))
+
+
+def probe_artifact(fingerprint: str) -> Path:
+    """Where the `RgbProbe` for checkpoint `fingerprint` is saved."""
+    return Path(ARTIFACT_DIR) / f"{fingerprint}.probe.pt"
+
+
+def build_screener(
+    name: str,
+    detector: SpoofDetector,
+    fingerprint: str,
+    size: int = 112,
+    cpu_mode: str = "fp32",
+) -> Callable[[torch.Tensor], torch.Tensor]:
+    """
+    Build screener `name` around `detector`.
+
+    Args:
+        fingerprint: checkpoint fingerprint; locates the trained probe.
+        size: input side for the "downscale" screener.
+        cpu_mode: resolved `inference.cpu_mode` mode; "bf16" runs the
+            screener under autocast like the eager backend.
+    """
+    screener = _build_screener(name, detector, fingerprint, size).eval()
+    if cpu_mode == "bf16":
+        from inference.backends import EagerBackend
+        from inference.cpu_mode import AutocastBackend
+
+        return AutocastBackend(EagerBackend(screener))
+    return screener
+
+
+def _build_screener(name, detector, fingerprint, size) -> nn.Module:
+    if name == "downscale":
+        return DownscaleScreener(detector, size)
+    if name == "rgb_probe":
+        path = probe_artifact(fingerprint)
+        if not path.exists():
+            raise FileNotFoundError(
+                f"{path} not found; train it with "
+                "`python -m inference cascade <val folder> --train-probe <train folder>`"
+            )
+        probe = RgbProbe()
+        probe.load_state_dict(torch.load(path, map_location="cpu"))
+        return RgbProbeScreener(detector, probe)
+    raise ValueError(f"Unknown screener {name!r}; expected one of {SCREENERS}")
+
+
+def run_cascade(
+    screener: Callable[[torch.Tensor], torch.Tensor],
+    full: Callable[[torch.Tensor], torch.Tensor],
+    x: torch.Tensor,
+    threshold: float,
+) -> tuple[torch.Tensor, list[float]]:
+    """
+    Logits for `x` from `screener` where its confidence reaches
+    `threshold`, else from `full`; plus each image's screener confidence.
+    """
+    start = time.perf_counter()
+    # The screener shares the detector's instrumented modules; count its
+    # time once, as "screen", not again under vgg_rgb etc.
+    with suspend_timings():
+        logits = screener(x).float()
+    screen_confidence = F.softmax(logits, dim=1).amax(dim=1)
+    record("screen", (time.perf_counter() - start) * 1000)
+    uncertain = (screen_confidence < threshold).nonzero().flatten()
+    if len(uncertain):
+        logits[uncertain] = full(x[uncertain]).float()
+    return logits, screen_confidence.tolist()
+
+
+def train_probe(
+    screener: RgbProbeScreener, folder: str | Path, batch_size: int = 16
+) -> RgbProbe:
+    """Fit `screener.probe` on an ImageFolder-style `folder` (``real/``, ``spoof/``)."""
+    from inference.quantize import LABELS, iter_image_batches
+
+    features, labels = [], []
+    with torch.no_grad():
+        for label_name, label in LABELS.items():
+            for rgb in iter_image_batches(Path(folder) / label_name, batch_size):
+                features.append(screener.features(torch.from_numpy(rgb)))
+                labels += [label] * len(rgb)
+    if len(set(labels)) < 2:
+        raise ValueError(f"{folder} needs images under both real/ and spoof/")
+    return screener.probe.fit(torch.cat(features), torch.tensor(labels))
+
+
+def evaluate_cascade(
+    screener: Callable[[torch.Tensor], torch.Tensor],
+    full: Callable[[torch.Tensor], torch.Tensor],
+    folder: str | Path,
+    thresholds: Sequence[float] = THRESHOLDS,
+    batch_size: int = 16,
+) -> dict:
+    """
+    Early-exit rate, accuracy and estimated cost of the cascade at each
+    threshold on an ImageFolder-style `folder`.
+
+    Every image goes through both stages once; each threshold is then
+    simulated from the recorded outputs. ``ms_per_image`` is the
+    screener's cost plus the full model's, weighted by the share of
+    images that do not exit early.
+    """
+    from inference.quantize import LABELS, iter_image_batches
+
+    screen_probs, full_preds, labels = [], [], []
+    seconds = {"screen": 0.0, "full": 0.0}
+    with torch.no_grad():
+        for label_name, label in LABELS.items():
+            for rgb in iter_image_batches(Path(folder) / label_name, batch_size):
+                x = torch.from_numpy(rgb)
+                for stage, fn in (("screen", screener), ("full", full)):
+                    start = time.perf_counter()
+                    out = fn(x).float()
+                    seconds[stage] += time.perf_counter() - start
+                    if stage == "screen":
+                        screen_probs.append(F.softmax(out, dim=1))
+                    else:
+                        full_preds.append(out.argmax(dim=1))
+                labels += [label] * len(rgb)
+
+    total = len(labels)
+    if not total:
+        raise ValueError(f"No images under {folder}/real or {folder}/spoof")
+    probs = torch.cat(screen_probs)
+    screen_conf, screen_pred = probs.max(dim=1)
+    full_pred = torch.cat(full_preds)
+    y = torch.tensor(labels)
+    screen_ms = seconds["screen"] * 1000 / total
+    full_ms = seconds["full"] * 1000 / total
+
+    rows = []
+    for t in thresholds:
+        exits = screen_conf >= t
+        pred = torch.where(exits, screen_pred, full_pred)
+        n_exits = int(exits.sum())
+        rows.append(
+            {
+                "threshold": t,
+                "exit_rate": n_exits / total,
+                "accuracy": float((pred == y).float().mean()),
+                "exit_accuracy": float((screen_pred[exits] == y[exits]).float().mean()) if n_exits else None,
+                "ms_per_image": screen_ms + full_ms * (1 - n_exits / total),
+            }
+        )
+    return {
+        "images": total,
+        "full": {"accuracy": float((full_pred == y).float().mean()), "ms_per_image": full_ms},
+        "screen": {"accuracy": float((screen_pred == y).float().mean()), "ms_per_image": screen_ms},
+        "thresholds": rows,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("folder", help="ImageFolder-style folder (real/, spoof/) to evaluate on")
+    parser.add_argument("--screener", choices=SCREENERS, default=CASCADE or "downscale")
+    parser.add_argument("--size", type=int, default=CASCADE_SIZE, help="downscale input side")
+    parser.add_argument("--train-probe", metavar="FOLDER", help="train the rgb_probe on this folder first")
+    parser.add_argument(
+        "--thresholds",
+        type=lambda v: tuple(float(t) for t in v.split(",") if t),
+        default=THRESHOLDS,
+        help="e.g. 0.9,0.95,0.99",
+    )
+    parser.add_argument("--batch-size", type=int, default=16)
+
+
+def run(args: argparse.Namespace) -> int:
+    from inference.backends import write_atomic
+    from inference.checkpoint import checkpoint_fingerprint
+    from inference.predictor import cpu_mode, get_backend, get_detector
+
+    detector = get_detector()
+    fingerprint = checkpoint_fingerprint()
+    if args.train_probe:
+        screener = RgbProbeScreener(detector, RgbProbe())
+        train_probe(screener, args.train_probe, args.batch_size)
+        path = probe_artifact(fingerprint)
+        write_atomic(path, lambda tmp: torch.save(screener.probe.state_dict(), tmp))
+        logger.info("Saved %s", path)
+        args.screener = "rgb_probe"
+
+    screener = build_screener(args.screener, detector, fingerprint, args.size, cpu_mode())
+    report = evaluate_cascade(screener, get_backend(), args.folder, args.thresholds, args.batch_size)
+    report["screener"] = args.screener
+    print(json.dumps(report, indent=2))
+    return 0
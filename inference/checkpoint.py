@@ -0,0 +1,152 @@
+"""
+Checkpoint loading and conversion.
+
+The model is built on the ``meta`` device from the architecture alone and
+the checkpoint tensors are assigned into it directly. With a memory-mapped
+``torch.load`` the weights are paged in from disk on demand instead of
+being copied, so startup needs no network and peak memory stays close to
+one copy of the weights.
+
+Convert a training checkpoint to a tensors-only file with
+
+    python -m inference checkpoint models/best_model.pth models/model.pt
+
+``.safetensors`` files need the optional ``safetensors`` package.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import logging
+import time
+from pathlib import Path
+
+import torch
+
+from inference.config import CHECKPOINT_PATH, device
+from inference.model import build_model
+
+logger = logging.getLogger(__name__)
+
+# Filled in by `load_model`: {"checkpoint", "format", "load_seconds", "peak_rss_mb"}
+LOAD_STATS: dict = {}
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MB, if the OS reports it."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def checkpoint_fingerprint(path: str | Path | None = None) -> str:
+    """Content hash of the checkpoint file, memoized per path/size/mtime."""
+    path = Path(path or CHECKPOINT_PATH)
+    stat = path.stat()
+    return _file_hash(str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _file_hash(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_state_dict(path: str | Path) -> dict[str, torch.Tensor]:
+    """
+    Read a FullModel state dict from `path` without copying tensors.
+
+    Accepts the training checkpoint ({"model_state_dict": ...}), a plain
+    tensors-only state dict, or a ``.safetensors`` file.
+    """
+    path = Path(path)
+    if path.suffix == ".safetensors":
+        return _safetensors().load_file(str(path), device=str(device))
+
+    try:
+        ckpt = torch.load(path, map_location=device, mmap=True)
+    except RuntimeError:
+        # Legacy (non-zipfile) checkpoints cannot be memory-mapped.
+        ckpt = torch.load(path, map_location=device)
+
+    if "model_state_dict" in ckpt:
+        return ckpt["model_state_dict"]
+    return ckpt
+
+
+def load_model(path: str | Path | None = None) -> torch.nn.Module:
+    """
+    Build `FullModel` from the architecture and load weights from `path`.
+
+    Parameters are created on the ``meta`` device and replaced by the
+    checkpoint tensors (``assign=True``), so no throwaway initialization is
+    allocated. Timing and peak RSS are recorded in `LOAD_STATS`.
+    """
+    path = Path(path or CHECKPOINT_PATH)
+    start = time.perf_counter()
+
+    with torch.device("meta"):
+        model = build_model(pretrained=False)
+    model.load_state_dict(load_state_dict(path), assign=True)
+    model.eval()
+
+    LOAD_STATS.update(
+        checkpoint=str(path),
+        format="safetensors" if path.suffix == ".safetensors" else "torch",
+        load_seconds=time.perf_counter() - start,
+        peak_rss_mb=peak_rss_mb(),
+    )
+    logger.info(
+        "Loaded %s in %.2fs (peak RSS %s MB)",
+        path, LOAD_STATS["load_seconds"], LOAD_STATS["peak_rss_mb"],
+    )
+    return model
+
+
+def convert_checkpoint(src: str | Path, dst: str | Path) -> Path:
+    """
+    Write a tensors-only copy of the checkpoint at `src` to `dst`.
+
+    Optimizer state and training metadata are dropped. A ``.safetensors``
+    destination needs the optional ``safetensors`` package; any other
+    suffix is written with ``torch.save`` and loads memory-mapped.
+    """
+    dst = Path(dst)
+    state_dict = {k: v.contiguous() for k, v in load_state_dict(src).items()}
+
+    if dst.suffix == ".safetensors":
+        _safetensors().save_file(state_dict, str(dst))
+    else:
+        torch.save(state_dict, dst)
+    return dst
+
+
+def _safetensors():
+    try:
+        import safetensors.torch
+    except ImportError as exc:
+        raise ImportError(
+            "reading or writing .safetensors checkpoints needs the optional "
+            "safetensors package: pip install safetensors"
+        ) from exc
+    return safetensors.torch
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("src", help="training checkpoint, e.g. models/best_model.pth")
+    parser.add_argument("dst", help="output path (.pt or .safetensors)")
+
+
+def run(args: argparse.Namespace) -> int:
+    print(f"Wrote {convert_checkpoint(args.src, args.dst)}")
+    load_model(args.dst)
+    print(f"Cold start: {LOAD_STATS['load_seconds']:.2f}s, peak RSS {LOAD_STATS['peak_rss_mb']} MB")
+    return 0
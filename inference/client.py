@@ -0,0 +1,164 @@
+"""
+Client for the HTTP inference service (`inference.server`).
+
+Set ``SPOOF_REMOTE_URL`` (e.g. ``http://127.0.0.1:8765``) and the
+Streamlit UI sends images to that service instead of loading the model
+in-process. Only the standard library is used, so importing this module
+stays as cheap as `inference.runtime`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+import uuid
+from typing import Callable, Sequence
+
+REMOTE_URL = os.environ.get("SPOOF_REMOTE_URL", "").rstrip("/")
+
+# Images sent per request; the server re-batches across requests anyway.
+REQUEST_CHUNK = 8
+READY_CHECK_INTERVAL_S = 1.0
+
+
+class RemoteClient:
+    """`predict_batch` and readiness over HTTP."""
+
+    def __init__(self, url: str = REMOTE_URL, timeout: float = 300.0, retries: int = 5):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+
+    def readiness(self) -> dict:
+        """The server's /readyz body; ``{"state": "error", ...}`` if unreachable."""
+        try:
+            with urllib.request.urlopen(f"{self.url}/readyz", timeout=5) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as exc:
+            return json.load(exc)
+        except OSError as exc:
+            return {"state": "error", "error": f"cannot reach {self.url}: {exc}"}
+
+    def predict_batch(
+        self,
+        files: Sequence,
+        progress_callback: Callable[[int, int], None] | None = None,
+        **_,
+    ) -> list[dict]:
+        """
+        Same contract as `inference.predict_batch`, for uploads or
+        ImageHandles. Requests the server rejects as overloaded (503) are
+        retried after its ``Retry-After``; a request that still fails
+        gives each of its files an error result, as a failed batch does
+        in-process.
+        """
+        results = []
+        for start in range(0, len(files), REQUEST_CHUNK):
+            chunk = files[start : start + REQUEST_CHUNK]
+            try:
+                response = self._post_predict([(f.name, f.getvalue()) for f in chunk])
+            except (OSError, ValueError) as exc:  # HTTP, connection and JSON errors
+                message = _error_message(exc)
+                results += [
+                    {"label": "error", "confidence": 0.0, "details": {"error": message}}
+                    for _ in chunk
+                ]
+                if progress_callback is not None:
+                    progress_callback(len(results), len(files))
+                continue
+            for item in response["results"]:
+                details = dict(item.get("details", {}))
+                details["latency_ms"] = response["latency_ms"]
+                results.append(
+                    {"label": item["label"], "confidence": item["confidence"], "details": details}
+                )
+            if progress_callback is not None:
+                progress_callback(len(results), len(files))
+        return results
+
+    def _post_predict(self, files: list[tuple[str, bytes]]) -> dict:
+        boundary = uuid.uuid4().hex
+        body = b"".join(
+            (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="file"; filename="{_quote(name)}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode()
+            + data
+            + b"\r\n"
+            for name, data in files
+        ) + f"--{boundary}--\r\n".encode()
+        request = urllib.request.Request(
+            f"{self.url}/predict",
+            data=body,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        for attempt in range(self.retries + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return json.load(response)
+            except urllib.error.HTTPError as exc:
+                if exc.code != 503 or attempt == self.retries:
+                    raise
+                time.sleep(float(exc.headers.get("Retry-After") or 1))
+
+
+def _error_message(exc: BaseException) -> str:
+    """`inference.pipeline.error_result`'s message, with the server's reason if any."""
+    if isinstance(exc, urllib.error.HTTPError):
+        try:
+            return f"HTTP {exc.code}: {json.load(exc)['error']}"
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _quote(filename: str) -> str:
+    """`filename` escaped for a quoted header parameter, line breaks removed."""
+    filename = filename.replace("\r", "").replace("\n", "")
+    return filename.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class RemoteModelLoader:
+    """
+    `inference.runtime.ModelLoader` look-alike that reports the remote
+    service's readiness, re-checked at most once per second.
+    """
+
+    def __init__(self, client: RemoteClient):
+        self.client = client
+        self.load_seconds: float | None = None
+        self._checked_at = 0.0
+        self._status: dict = {"state": "loading"}
+
+    def start(self) -> RemoteModelLoader:
+        return self
+
+    def _refresh(self) -> dict:
+        if time.monotonic() - self._checked_at >= READY_CHECK_INTERVAL_S:
+            self._status = self.client.readiness()
+            self._checked_at = time.monotonic()
+        return self._status
+
+    @property
+    def state(self) -> str:
+        return self._refresh().get("state", "error")
+
+    @property
+    def error(self) -> str | None:
+        return self._refresh().get("error")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def wait(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.ready and self.state != "error":
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(READY_CHECK_INTERVAL_S)
+        return self.ready
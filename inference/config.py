@@ -0,0 +1,88 @@
+"""
+Runtime configuration for the inference package.
+
+Every knob can be overridden with a ``SPOOF_*`` environment variable.
+"""
+
+from __future__ import annotations
+
+import os
+
+import torch
+
+IMAGENET_MEAN = torch.tensor([0.485, 0.456, 0.406]).view(3,1,1)
+IMAGENET_STD  = torch.tensor([0.229, 0.224, 0.225]).view(3,1,1)
+device = torch.device("cpu")
+
+# Model checkpoint. Either the training checkpoint ({"model_state_dict": ...})
+# or a tensors-only file written by `inference.checkpoint.convert_checkpoint`.
+CHECKPOINT_PATH = os.environ.get("SPOOF_CHECKPOINT", "models/best_model.pth")
+
+# Inference backend: "eager", "torchscript", "compile", "onnx" or "int8"
+# (see `inference.backends`). Compiled artifacts are cached in ARTIFACT_DIR.
+BACKEND = os.environ.get("SPOOF_BACKEND", "eager")
+ARTIFACT_DIR = os.environ.get("SPOOF_ARTIFACT_DIR", "models/compiled")
+
+# CPU precision / layout: "fp32", "channels_last", "bf16" or "auto" (bf16
+# where the CPU supports it). bf16 is lossy and applies to the eager and
+# compile backends; see `inference.cpu_mode`.
+CPU_MODE = os.environ.get("SPOOF_CPU_MODE", "fp32")
+
+# How the RGB and FFT VGG trunks are scheduled: "sequential", "fork" (with
+# the torchscript backend) or "threads" (eager, halves the process's intra-op
+# threads at startup). Opt-in: the concurrent strategies are unbenchmarked on
+# many-core hosts. See `inference.branches`.
+BRANCH_STRATEGY = os.environ.get("SPOOF_BRANCH_STRATEGY", "sequential")
+
+# Cross-attention fusion: "full" (as trained), or the approximate "pooled_kv"
+# / "pooled" modes that attend over tokens pooled to FUSION_GRID x
+# FUSION_GRID. See `inference.fusion` for the accuracy report.
+FUSION_MODE = os.environ.get("SPOOF_FUSION_MODE", "full")
+FUSION_GRID = int(os.environ.get("SPOOF_FUSION_GRID", "14"))
+
+# Confidence-gated cascade: "" (off), "downscale" or "rgb_probe" (see
+# `inference.cascade`). Images the screener labels with at least
+# CASCADE_THRESHOLD confidence skip the full model.
+CASCADE = os.environ.get("SPOOF_CASCADE", "")
+CASCADE_THRESHOLD = float(os.environ.get("SPOOF_CASCADE_THRESHOLD", "0.95"))
+CASCADE_SIZE = int(os.environ.get("SPOOF_CASCADE_SIZE", "112"))
+
+# Batch sizes pushed through the model once after loading.
+WARMUP_BATCH_SIZES = tuple(
+    int(n) for n in os.environ.get("SPOOF_WARMUP_BATCH_SIZES", "1,4").split(",") if n
+)
+
+# In-process result cache (see `inference.cache.ResultCache`).
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("SPOOF_RESULT_CACHE_ENTRIES", "10000"))
+RESULT_CACHE_MAX_MB = int(os.environ.get("SPOOF_RESULT_CACHE_MB", "64"))
+
+# Persistent SQLite result store (see `inference.store.ResultStore`).
+# An empty path disables it.
+RESULT_STORE_PATH = os.environ.get("SPOOF_RESULT_STORE", "models/results.sqlite")
+RESULT_STORE_TTL_DAYS = float(os.environ.get("SPOOF_RESULT_STORE_TTL_DAYS", "30"))
+RESULT_STORE_MAX_ENTRIES = int(os.environ.get("SPOOF_RESULT_STORE_MAX_ENTRIES", "1000000"))
+
+# Batching: a single sample needs roughly this much activation memory in
+# fp32, dominated by the 64x224x224 VGG stages and the 16-head 784x784
+# attention maps in BiCrossAttentionFusion.
+BYTES_PER_SAMPLE = 128 * 1024 * 1024
+MEMORY_BUDGET_MB = int(os.environ.get("SPOOF_MEMORY_BUDGET_MB", "2048"))
+MAX_BATCH_SIZE = 32
+
+# Threads decoding images ahead of the model (see `inference.pipeline`).
+DECODE_WORKERS = int(os.environ.get("SPOOF_DECODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Multi-process inference (see `inference.multiproc`): number of worker
+# processes (0 = run in this process) and torch threads per worker.
+PROCESS_WORKERS = int(os.environ.get("SPOOF_PROCESS_WORKERS", "0"))
+THREADS_PER_WORKER = int(
+    os.environ.get(
+        "SPOOF_THREADS_PER_WORKER",
+        str(max(1, (os.cpu_count() or 1) // max(1, PROCESS_WORKERS))),
+    )
+)
+
+# High-pass engine: "fft" (rfft2 round trip) or "lowpass" (subtract the
+# low-frequency reconstruction built from the few coefficients the ideal
+# high-pass drops). See `inference.preprocess.compare_highpass_engines`.
+HIGHPASS_ENGINE = os.environ.get("SPOOF_HIGHPASS_ENGINE", "fft")
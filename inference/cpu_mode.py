@@ -0,0 +1,134 @@
+"""
+CPU precision / memory-layout modes.
+
+    fp32           NCHW fp32 (the original path, and the default)
+    channels_last  fp32 with channels-last conv weights and inputs, so
+                   oneDNN runs the VGG stacks in NHWC without reorders
+                   between layers
+    bf16           channels_last plus CPU bf16 autocast; uses AMX /
+                   AVX512-BF16 on hosts that have them
+
+bf16 changes predictions slightly, so it is never picked implicitly:
+request it, or "auto" (bf16 on CPUs with native bf16 instructions, fp32
+elsewhere). A bf16 request on older hardware falls back to fp32, since
+emulated bf16 is slower than fp32. Logits are cast back to fp32 before
+the softmax, so confidences keep full precision.
+
+Converting the conv weights to channels-last copies them out of the
+memory-mapped checkpoint (about 14 MB for the two VGG trunks) into
+private memory in each process. Compare modes on a host with
+`benchmark_cpu_modes`.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from typing import Sequence
+
+import torch
+
+from inference.model import SpoofDetector
+
+logger = logging.getLogger(__name__)
+
+CPU_MODES = ("fp32", "channels_last", "bf16")
+
+_BF16_FLAGS = {"avx512_bf16", "amx_bf16"}
+
+
+@functools.lru_cache(maxsize=None)
+def cpu_supports_bf16() -> bool:
+    """True when the CPU executes bf16 natively (AVX512-BF16 or AMX)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return bool(_BF16_FLAGS & set(line.split()))
+    except OSError:
+        pass
+    # No cpuinfo (non-Linux): trust oneDNN, which also checks the ISA.
+    return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+
+
+def resolve_cpu_mode(mode: str) -> str:
+    """Map "auto" (or an unsupported request) to a mode this CPU can run."""
+    if mode == "auto":
+        return "bf16" if cpu_supports_bf16() else "fp32"
+    if mode not in CPU_MODES:
+        raise ValueError(f"Unknown CPU mode {mode!r}; expected 'auto' or one of {CPU_MODES}")
+    if mode == "bf16" and not cpu_supports_bf16():
+        logger.warning("CPU has no native bf16 support; using fp32")
+        return "fp32"
+    return mode
+
+
+def apply_cpu_mode(detector: SpoofDetector, mode: str) -> SpoofDetector:
+    """
+    Convert `detector` in place to the memory layout `mode` needs: the
+    conv weights (a copy, see above) and the preprocessed batches.
+    """
+    if mode in ("channels_last", "bf16"):
+        detector.to(memory_format=torch.channels_last)
+        detector.preprocess.memory_format = torch.channels_last
+    return detector
+
+
+class AutocastBackend:
+    """Runs another backend under CPU bf16 autocast, returning fp32 logits."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = f"{backend.name}+bf16"
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        with torch.autocast("cpu", dtype=torch.bfloat16):
+            logits = self.backend(x)
+        return logits.float()
+
+
+def benchmark_cpu_modes(
+    modes: Sequence[str] = CPU_MODES,
+    batch_sizes: Sequence[int] = (1, 8),
+    repeats: int = 5,
+) -> dict[str, dict]:
+    """
+    Time the eager detector in each mode.
+
+    Returns {mode: {"ms": {batch_size: median ms per batch},
+    "max_prob_diff": max |softmax difference| against the first mode}}.
+    Modes the CPU cannot run natively are skipped.
+    """
+    from inference.backends import EagerBackend
+    from inference.checkpoint import load_model
+    from inference.preprocess import Preprocess
+
+    generator = torch.Generator().manual_seed(0)
+    inputs = {
+        n: torch.randint(0, 256, (n, 224, 224, 3), dtype=torch.uint8, generator=generator)
+        for n in batch_sizes
+    }
+    reference = {}
+    report = {}
+    for mode in modes:
+        if mode == "bf16" and not cpu_supports_bf16():
+            continue
+        detector = apply_cpu_mode(SpoofDetector(Preprocess(size=224, r=8), load_model()), mode)
+        run = EagerBackend(detector)
+        if mode == "bf16":
+            run = AutocastBackend(run)
+        timings, diff = {}, 0.0
+        with torch.no_grad():
+            for n, x in inputs.items():
+                probs = torch.softmax(run(x).float(), dim=1)  # warm-up
+                reference.setdefault(n, probs)
+                diff = max(diff, (probs - reference[n]).abs().max().item())
+                samples = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    run(x)
+                    samples.append((time.perf_counter() - start) * 1000)
+                timings[n] = sorted(samples)[len(samples) // 2]
+        report[mode] = {"ms": timings, "max_prob_diff": diff}
+    return report
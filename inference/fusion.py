@@ -0,0 +1,128 @@
+"""
+Approximate, token-pooled cross-attention fusion.
+
+`BiCrossAttentionFusion` flattens each 28x28 feature map into 784 tokens
+and runs two 784x784 cross-attentions, then mean-pools the result. The
+pooled modes average-pool tokens to a ``grid x grid`` map first:
+
+    full        the trained fusion, unchanged
+    pooled_kv   keys/values pooled; every query token is kept
+                (784 x grid^2 attention)
+    pooled      queries pooled too (grid^2 x grid^2 attention). With a
+                grid dividing 28 the residual branch still averages to
+                exactly the full-resolution mean.
+
+Both reuse the trained attention weights and skip the averaged attention
+map, so `nn.MultiheadAttention` dispatches to the fused
+`scaled_dot_product_attention` kernel. They change predictions slightly:
+measure them with
+
+    python -m inference fusion data/val --grids 14,7
+
+on an ImageFolder-style folder (``real/``, ``spoof/``) before enabling
+one with ``SPOOF_FUSION_MODE`` / ``SPOOF_FUSION_GRID``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Sequence
+
+import torch
+import torch.nn as nn
+from torch.nn import functional as F
+
+from inference.model import BiCrossAttentionFusion, FullModel
+
+FUSION_MODES = ("full", "pooled_kv", "pooled")
+
+
+class PooledBiCrossAttentionFusion(BiCrossAttentionFusion):
+    """`BiCrossAttentionFusion` sharing `fusion`'s attention, on pooled tokens."""
+
+    def __init__(self, fusion: BiCrossAttentionFusion, grid: int = 14, pool_queries: bool = False):
+        nn.Module.__init__(self)
+        self.C = fusion.C
+        self.nheads = fusion.nheads
+        self.attn_rgb_from_fft = fusion.attn_rgb_from_fft
+        self.attn_fft_from_rgb = fusion.attn_fft_from_rgb
+        self.grid = grid
+        self.pool_queries = pool_queries
+
+    def forward(self, F_rgb, F_fft):
+        kv_rgb = _tokens(F.adaptive_avg_pool2d(F_rgb, self.grid))  # (grid*grid, B, C)
+        kv_fft = _tokens(F.adaptive_avg_pool2d(F_fft, self.grid))
+        if self.pool_queries:
+            q_rgb, q_fft = kv_rgb, kv_fft
+        else:
+            q_rgb, q_fft = _tokens(F_rgb), _tokens(F_fft)  # (H*W, B, C)
+        z_rgb, _ = self.attn_rgb_from_fft(q_rgb, kv_fft, kv_fft, need_weights=False)
+        z_fft, _ = self.attn_fft_from_rgb(q_fft, kv_rgb, kv_rgb, need_weights=False)
+        z_rgb = z_rgb + q_rgb
+        z_fft = z_fft + q_fft
+        return torch.cat([z_rgb.mean(dim=0), z_fft.mean(dim=0)], dim=1)  # (B, 2C)
+
+
+def _tokens(feature_map):
+    return feature_map.flatten(2).permute(2, 0, 1)
+
+
+def with_fusion_mode(model: FullModel, mode: str, grid: int = 14) -> FullModel:
+    """`model` itself for "full", else a copy sharing its weights with pooled fusion."""
+    if mode not in FUSION_MODES:
+        raise ValueError(f"Unknown fusion mode {mode!r}; expected one of {FUSION_MODES}")
+    if mode == "full":
+        return model
+    fusion = PooledBiCrossAttentionFusion(model.fusion, grid, pool_queries=mode == "pooled")
+    return FullModel(model.vgg_rgb, model.vgg_fft, fusion, model.head)
+
+
+def fusion_tag(mode: str, grid: int) -> str:
+    """Short name for fingerprints and reports, e.g. "pooled_kv14"; "" for full."""
+    return "" if mode == "full" else f"{mode}{grid}"
+
+
+def compare_fusion_modes(
+    folder: str | Path,
+    grids: Sequence[int] = (14, 7),
+    batch_size: int = 16,
+) -> dict:
+    """
+    Accuracy and latency of every pooled mode and grid against "full" on
+    an ImageFolder-style `folder`, with each one's accuracy delta and
+    speedup relative to "full".
+    """
+    from inference.checkpoint import load_model
+    from inference.model import SpoofDetector
+    from inference.preprocess import Preprocess
+    from inference.quantize import evaluate_folder
+
+    model = load_model()
+    preprocess = Preprocess(size=224, r=8)
+    models = {"full": SpoofDetector(preprocess, model).eval()}
+    for mode in FUSION_MODES[1:]:
+        for grid in grids:
+            pooled = with_fusion_mode(model, mode, grid)
+            models[fusion_tag(mode, grid)] = SpoofDetector(preprocess, pooled).eval()
+
+    report = evaluate_folder(models, folder, batch_size)
+    full = report["full"]
+    for name in models:
+        stats = report[name]
+        stats["accuracy_delta"] = stats["accuracy"] - full["accuracy"]
+        stats["speedup"] = full["seconds"] / stats["seconds"] if stats["seconds"] else float("nan")
+    return report
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("folder", help="ImageFolder-style folder (real/, spoof/)")
+    parser.add_argument("--grids", default="14,7", help="pooled grid sizes, e.g. 14,7")
+    parser.add_argument("--batch-size", type=int, default=16)
+
+
+def run(args: argparse.Namespace) -> int:
+    grids = tuple(int(g) for g in args.grids.split(",") if g)
+    print(json.dumps(compare_fusion_modes(args.folder, grids, args.batch_size), indent=2))
+    return 0
@@ -0,0 +1,173 @@
+"""
+`ImageHandle`: one input image, read once and shared by preview,
+metadata and inference.
+
+Used by the Streamlit UI, the scan CLI and the HTTP service alike, so it
+lives here rather than under `ui/`.
+"""
+
+from __future__ import annotations
+
+import base64
+import functools
+import os
+import threading
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from inference.cache import content_hash
+
+if TYPE_CHECKING:
+    from streamlit.runtime.uploaded_file_manager import UploadedFile
+
+
+# Thumbnail settings
+THUMBNAIL_MAX_EDGE = int(os.environ.get("SPOOF_THUMBNAIL_MAX_EDGE", "384"))
+THUMBNAIL_QUALITY = 80
+
+_FORMAT_MIME = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+class ImageHandle:
+    """
+    One image, read once and shared by preview, metadata and inference.
+
+    Bytes are read a single time; dimensions and format come from the file
+    header without decoding pixels. Pixels are decoded lazily into the
+    products callers need: `thumbnail` builds only the preview thumbnail,
+    and `rgb_224` builds the 224x224 RGB model input plus, for handles
+    created with ``with_thumbnail=True`` (the UI's), the thumbnail in the
+    same decode if it is not there yet. The decode uses the
+    reduced-resolution path in `inference.decode`, and the decoded image
+    itself is not kept.
+
+    The model input stays cached until `release_pixels`, which the
+    inference pipeline calls once the image's batch has been predicted.
+
+    Mirrors the parts of Streamlit's UploadedFile the app uses (`name`,
+    `size`, `file_id`, `getvalue()`), so it can be passed anywhere an
+    upload was.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        name: str,
+        file_id: str | None = None,
+        with_thumbnail: bool = False,
+    ):
+        self._data = data
+        self.name = name
+        self.file_id = file_id
+        self.size = len(data)
+        self.with_thumbnail = with_thumbnail
+        self._rgb_224: np.ndarray | None = None
+        self._thumbnail: tuple[str, str] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_upload(
+        cls, uploaded_file: UploadedFile | ImageHandle, with_thumbnail: bool = False
+    ) -> ImageHandle:
+        """Wrap an UploadedFile; existing handles are returned unchanged."""
+        if isinstance(uploaded_file, ImageHandle):
+            return uploaded_file
+        return cls(
+            uploaded_file.getvalue(),
+            uploaded_file.name,
+            getattr(uploaded_file, "file_id", None),
+            with_thumbnail,
+        )
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+    @functools.cached_property
+    def content_hash(self) -> str:
+        return content_hash(self._data)
+
+    @functools.cached_property
+    def _header(self) -> tuple[tuple[int, int], str | None]:
+        with Image.open(BytesIO(self._data)) as img:   # parses the header only
+            return img.size, img.format
+
+    @property
+    def dimensions(self) -> tuple[int, int]:
+        """(width, height) read from the file header."""
+        return self._header[0]
+
+    @property
+    def format(self) -> str | None:
+        """PIL format name ("JPEG", "PNG", ...) read from the file header."""
+        return self._header[1]
+
+    @property
+    def mime_type(self) -> str:
+        try:
+            return _FORMAT_MIME.get(self.format) or get_mime_type(self)
+        except OSError:
+            return get_mime_type(self)
+
+    def rgb_224(self) -> np.ndarray:
+        """(224,224,3) uint8 RGB model input, decoded on first use."""
+        with self._lock:
+            if self._rgb_224 is None:
+                self._decode(
+                    rgb_224=True, thumbnail=self.with_thumbnail and self._thumbnail is None
+                )
+            return self._rgb_224
+
+    def thumbnail(self) -> tuple[str, str]:
+        """(base64, mime) preview thumbnail, decoded on first use."""
+        with self._lock:
+            if self._thumbnail is None:
+                self._decode(rgb_224=False, thumbnail=True)
+            return self._thumbnail
+
+    def release_pixels(self):
+        """Drop the cached model input; it is decoded again if needed."""
+        with self._lock:
+            self._rgb_224 = None
+
+    def _decode(self, rgb_224: bool, thumbnail: bool):
+        # Imported here so the UI can render before cv2 is loaded.
+        from inference.decode import decode_image, to_model_input
+
+        img = decode_image(self._data)
+        if rgb_224:
+            self._rgb_224 = to_model_input(img)
+        if thumbnail:
+            self._thumbnail = encode_thumbnail(img)
+
+
+def encode_thumbnail(img: Image.Image, max_edge: int = THUMBNAIL_MAX_EDGE) -> tuple[str, str]:
+    """Shrink a PIL image to `max_edge` and return a (base64, mime) thumbnail."""
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    has_alpha = img.mode in ("RGBA", "LA") or (
+        img.mode == "P" and "transparency" in img.info
+    )
+    buf = BytesIO()
+    if has_alpha:
+        img.convert("RGBA").save(buf, format="WEBP", quality=THUMBNAIL_QUALITY)
+        mime = "image/webp"
+    else:
+        img.convert("RGB").save(buf, format="JPEG", quality=THUMBNAIL_QUALITY)
+        mime = "image/jpeg"
+    return base64.b64encode(buf.getvalue()).decode("utf-8"), mime
+
+
+def get_mime_type(uploaded_file: UploadedFile | ImageHandle) -> str:
+    """Return the MIME type string for an uploaded file, from its name."""
+    name = uploaded_file.name.lower()
+    if name.endswith(".png"):
+        return "image/png"
+    if name.endswith((".jpg", ".jpeg")):
+        return "image/jpeg"
+    if name.endswith(".webp"):
+        return "image/webp"
+    return "image/png"
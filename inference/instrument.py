@@ -0,0 +1,61 @@
+"""
+Stage timing for the detector's sub-modules (see `inference.metrics`).
+
+`instrument` adds forward hooks around the preprocessing, both VGG trunks,
+the fusion block and the head; `Preprocess` marks its FFT span with
+`stage_start` / `stage_end`. All of them are no-ops unless a
+`collect_timings()` block is open, and they stay out of traced, exported
+and compiled graphs.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+
+import torch
+import torch.nn as nn
+
+from inference.metrics import current_timings, record
+
+
+def stage_start() -> float | None:
+    """Start time for `stage_end`, or None when nothing is collecting."""
+    if torch.compiler.is_compiling() or torch.jit.is_tracing() or current_timings() is None:
+        return None
+    return time.perf_counter()
+
+
+def stage_end(stage: str, start: float | None):
+    if start is not None:
+        record(stage, (time.perf_counter() - start) * 1000)
+
+
+def _before(stage: str, module, args):
+    timings = current_timings()
+    if timings is not None and not (torch.compiler.is_compiling() or torch.jit.is_tracing()):
+        timings[f"_start_{stage}"] = time.perf_counter()
+
+
+def _after(stage: str, module, args, output):
+    timings = current_timings()
+    if timings is not None:
+        start = timings.pop(f"_start_{stage}", None)
+        if start is not None:
+            record(stage, (time.perf_counter() - start) * 1000)
+
+
+def instrument(detector: nn.Module) -> nn.Module:
+    """Time `detector`'s preprocess, vgg_rgb, vgg_fft, fusion and head."""
+    model = detector.model
+    stages = {
+        "preprocess": detector.preprocess,
+        "vgg_rgb": model.vgg_rgb,
+        "vgg_fft": model.vgg_fft,
+        "fusion": model.fusion,
+        "head": model.head,
+    }
+    for stage, module in stages.items():
+        module.register_forward_pre_hook(functools.partial(_before, stage))
+        module.register_forward_hook(functools.partial(_after, stage))
+    return detector
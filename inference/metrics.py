@@ -0,0 +1,274 @@
+"""
+Per-prediction stage timings and process-wide Prometheus metrics.
+
+Stage timings: `collect_timings()` opens a per-batch dict (held in a
+context variable), and `record` adds milliseconds to it from anywhere
+down the call stack, including the module hooks installed by
+`inference.instrument`. With no dict open it returns immediately. The
+collected timings end up in each result's ``details["timings_ms"]``.
+
+Metrics: counters, gauges and histograms rendered in the Prometheus text
+format. They only record when ``SPOOF_METRICS=1`` or
+``SPOOF_METRICS_FILE`` is set; otherwise every update is a single flag
+check. The HTTP service serves them on ``/metrics``, and with
+``SPOOF_METRICS_FILE`` any process (Streamlit, scans) rewrites that file
+every ``SPOOF_METRICS_INTERVAL_S`` seconds, e.g. for node_exporter's
+textfile collector.
+
+Importing this module does not import torch.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Iterator
+
+METRICS_FILE = os.environ.get("SPOOF_METRICS_FILE", "")
+METRICS_ENABLED = os.environ.get("SPOOF_METRICS", "") == "1" or bool(METRICS_FILE)
+METRICS_INTERVAL_S = float(os.environ.get("SPOOF_METRICS_INTERVAL_S", "15"))
+
+# Latency buckets in seconds, from a cached lookup to a large CPU batch.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+# ── Stage timings ────────────────────────────────────────────────────
+
+_timings: ContextVar[dict[str, float] | None] = ContextVar("spoof_stage_timings", default=None)
+
+
+@contextlib.contextmanager
+def collect_timings() -> Iterator[dict[str, float]]:
+    """Collect stage timings (ms) recorded inside the block into a dict."""
+    timings: dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextlib.contextmanager
+def suspend_timings() -> Iterator[None]:
+    """Record nothing inside the block, e.g. for work timed as one stage."""
+    token = _timings.set(None)
+    try:
+        yield
+    finally:
+        _timings.reset(token)
+
+
+def record(stage: str, ms: float):
+    """Add `ms` to `stage` in the open timings dict, if any."""
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + ms
+
+
+def current_timings() -> dict[str, float] | None:
+    return _timings.get()
+
+
+# ── Prometheus metrics ───────────────────────────────────────────────
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, k)} {v:g}" for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, *labels: str):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+    def set_function(self, fn: Callable[[], float], *labels: str):
+        """Read the value from `fn` at render time (e.g. a queue length)."""
+        with self._lock:
+            self._functions[labels] = fn
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        values.update((k, fn()) for k, fn in functions.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, k)} {v:g}" for k, v in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [bucket counts..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        if not METRICS_ENABLED:
+            return
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = self.header()
+        for labels, row in items:
+            names = self.label_names + ("le",)
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (f'{bound:g}',))} {cumulative:g}")
+            lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {row[-1]:g}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {row[-2]:g}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {row[-1]:g}")
+        return lines
+
+
+PREDICTIONS = Counter("spoof_predictions_total", "Images predicted, by label.", ("label",))
+CACHE_LOOKUPS = Counter(
+    "spoof_cache_lookups_total", "Result lookups, by outcome (memory, store, miss).", ("outcome",)
+)
+BATCHES = Counter("spoof_batches_total", "Model batches run.")
+CASCADE_DECISIONS = Counter(
+    "spoof_cascade_decisions_total", "Cascade predictions, by deciding stage (screen, full).", ("stage",)
+)
+STAGE_SECONDS = Histogram(
+    "spoof_stage_seconds", "Per-batch time spent in each pipeline stage.", ("stage",)
+)
+BATCH_SIZE = Histogram("spoof_batch_size", "Images per model batch.", buckets=BATCH_SIZE_BUCKETS)
+REQUEST_SECONDS = Histogram(
+    "spoof_request_seconds", "HTTP /predict latency, by status code.", ("status",)
+)
+REQUESTS_REJECTED = Counter("spoof_requests_rejected_total", "Requests rejected with 503.")
+QUEUE_DEPTH = Gauge("spoof_queue_depth", "Images waiting in the micro-batching queue.")
+MODEL_LOAD_SECONDS = Gauge("spoof_model_load_seconds", "Model load and warm-up time.")
+
+REGISTRY: list[_Metric] = [
+    PREDICTIONS,
+    CACHE_LOOKUPS,
+    BATCHES,
+    CASCADE_DECISIONS,
+    STAGE_SECONDS,
+    BATCH_SIZE,
+    REQUEST_SECONDS,
+    REQUESTS_REJECTED,
+    QUEUE_DEPTH,
+    MODEL_LOAD_SECONDS,
+]
+
+
+def observe_batch(results: list[dict]):
+    """
+    Record one model batch from its results' details: the batch-wide
+    stage timings once, and decode time summed over the images.
+    """
+    if not METRICS_ENABLED or not results:
+        return
+    BATCHES.inc()
+    details = results[0]["details"]
+    BATCH_SIZE.observe(details.get("batch_size", len(results)))
+    for stage, ms in details.get("timings_ms", {}).items():
+        if stage != "decode":
+            STAGE_SECONDS.observe(ms / 1000, stage)
+    decode_ms = sum(r["details"].get("timings_ms", {}).get("decode", 0.0) for r in results)
+    STAGE_SECONDS.observe(decode_ms / 1000, "decode")
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def write_file(path: str | Path = METRICS_FILE):
+    """Atomically replace `path` with the current metrics."""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(render())
+    os.replace(tmp, path)
+
+
+_writer: threading.Thread | None = None
+_writer_lock = threading.Lock()
+
+
+def start_file_writer():
+    """Rewrite `METRICS_FILE` periodically on a daemon thread (idempotent)."""
+    global _writer
+    if not METRICS_FILE or _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            def loop():
+                while True:
+                    time.sleep(METRICS_INTERVAL_S)
+                    write_file()
+
+            Path(METRICS_FILE).parent.mkdir(parents=True, exist_ok=True)
+            _writer = threading.Thread(target=loop, name="metrics-writer", daemon=True)
+            _writer.start()
@@ -0,0 +1,113 @@
+"""
+Model architecture: dual VGG trunks, cross-attention fusion and classifier.
+"""
+
+from __future__ import annotations
+
+import torch
+import torch.nn as nn
+from torchvision.models import vgg16, VGG16_Weights
+from torchvision.models.vgg import make_layers
+
+# VGG16 ("D") layers up to and including the third max-pool, i.e.
+# vgg16().features[:17] -> (B,256,28,28).
+VGG17_CFG = [64, 64, "M", 128, 128, "M", 256, 256, 256, "M"]
+
+
+class BiCrossAttentionFusion(nn.Module):
+    def __init__(self, C=256, nheads=16, attn_dropout=0.0):
+        super().__init__()
+        self.C = C
+        self.nheads = nheads
+
+        self.attn_rgb_from_fft = nn.MultiheadAttention(
+            embed_dim=C,num_heads=nheads, dropout=attn_dropout, batch_first=False
+        )
+        
+        self.attn_fft_from_rgb = nn.MultiheadAttention(
+            embed_dim=C,num_heads=nheads, dropout=attn_dropout, batch_first=False
+        )
+    def forward(self, F_rgb, F_fft):
+        rgb = F_rgb.flatten(2).permute(2, 0, 1)  # (H*W, B, C)
+        fft = F_fft.flatten(2).permute(2, 0, 1)  # (H*W, B, C)
+        z_rgb, _ = self.attn_rgb_from_fft(query=rgb, key=fft, value=fft)
+        z_fft, _ = self.attn_fft_from_rgb(query=fft, key=rgb, value=rgb)
+        z_rgb = z_rgb + rgb
+        z_fft = z_fft + fft
+        z_rgb = z_rgb.permute(1, 2, 0).contiguous()
+        z_fft = z_fft.permute(1, 2, 0).contiguous()
+        Z_tokens = torch.cat([z_rgb, z_fft], dim=1) 
+        Z= Z_tokens.mean(dim=2)
+        return  Z      
+
+
+class ClassifierHead(nn.Module):
+    def __init__(self, in_dim=512, num_classes=2, use_bn=True, p=0.2):
+        super().__init__()
+        def block(a, b):
+            layers = [nn.Linear(a, b)]
+            if use_bn:
+                layers.append(nn.BatchNorm1d(b))
+            layers.append(nn.ReLU(inplace=True))
+            if p > 0:
+                layers.append(nn.Dropout(p))
+            return nn.Sequential(*layers)
+
+        self.fc1 = block(in_dim, 256)
+        self.fc2 = block(256, 128)
+        self.fc3 = nn.Linear(128, num_classes) 
+
+    def forward(self, z):
+        z = self.fc1(z)   
+        z = self.fc2(z)   
+        logits = self.fc3(z)  
+        return logits
+
+def make_vgg17(pretrained=True):
+    if not pretrained:
+        return make_layers(VGG17_CFG)
+    weights = VGG16_Weights.IMAGENET1K_V1
+    vgg = vgg16(weights=weights)
+    return vgg.features[:17]
+
+class FullModel(nn.Module):
+    def __init__(self, vgg_rgb, vgg_fft, fusion, head):
+        super().__init__()
+        self.vgg_rgb = vgg_rgb          # output (B,256,28,28)
+        self.vgg_fft = vgg_fft          # output (B,256,28,28)
+        self.fusion = fusion            # output Z (B,512)
+        self.head = head                # output logits (B,2)
+
+    def forward(self, x_rgb, x_fft):
+        f_rgb = self.vgg_rgb(x_rgb)     # (B,256,28,28)
+        f_fft = self.vgg_fft(x_fft)     # (B,256,28,28)
+        Z = self.fusion(f_rgb, f_fft)   # (B,512)
+        logits = self.head(Z)           # (B,2)
+        return logits
+    
+class SpoofDetector(nn.Module):
+    """`Preprocess` in front of `FullModel`: uint8 (N,H,W,3) -> logits (N,2)."""
+
+    def __init__(self, preprocess, model):
+        super().__init__()
+        self.preprocess = preprocess
+        self.model = model
+
+    def forward(self, x):
+        x_rgb, x_fft = self.preprocess(x)
+        return self.model(x_rgb, x_fft)
+
+
+def build_model(pretrained=False):
+    """
+    Build an untrained `FullModel` with the default hyperparameters.
+
+    With ``pretrained=False`` the VGG trunks come from the architecture
+    alone, so nothing is downloaded and no ImageNet weights are allocated.
+    """
+    return FullModel(
+        vgg_rgb=make_vgg17(pretrained),
+        vgg_fft=make_vgg17(pretrained),
+        fusion=BiCrossAttentionFusion(C=256, nheads=16, attn_dropout=0.0),
+        head=ClassifierHead(in_dim=512, num_classes=2, use_bn=True, p=0.2)
+    )
@@ -0,0 +1,142 @@
+"""
+Multi-process sharded inference.
+
+Worker processes each run the full decode → model path on whole batches,
+so neither GIL-bound decoding nor a single intra-op thread pool limits
+throughput on many-core hosts. Weights are not copied per worker: every
+worker memory-maps the same checkpoint (see `inference.checkpoint`), and
+the read-only pages are shared through the OS page cache, so memory stays
+close to one copy of the weights regardless of worker count. (Legacy
+non-zipfile checkpoints cannot be memory-mapped; convert them first with
+``python -m inference checkpoint``.)
+
+That only holds while workers run the memory-mapped tensors as they are.
+The channels_last and bf16 CPU modes (which re-lay out the conv weights)
+and the torchscript, onnx and int8 backends each build their own copy of
+the weights, once per worker, so sharded mode refuses them: use the eager
+or compile backend with the fp32 CPU mode.
+
+At most `max_in_flight` batches (two per worker by default) are read and
+queued to the workers at a time, so memory does not grow with the input
+set.
+
+Workers are started with the ``spawn`` method, so scripts that enable
+``SPOOF_PROCESS_WORKERS`` need the usual ``if __name__ == "__main__":`` guard.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing as mp
+import threading
+from collections import deque
+from typing import Iterator, Sequence
+
+import torch
+
+from inference.config import BACKEND, CPU_MODE, PROCESS_WORKERS, THREADS_PER_WORKER
+from inference.cpu_mode import resolve_cpu_mode
+from inference.decode import decode_rgb_224
+from inference.pipeline import error_result, run_batch, timed_call
+
+
+def _init_worker(threads: int):
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    from inference.predictor import get_backend
+
+    get_backend()
+
+
+def _run_shard(datas: list[bytes]) -> list[dict]:
+    from inference.predictor import _predict_arrays
+
+    batch, decode_ms = [], {}
+    for i, data in enumerate(datas):
+        try:
+            rgb, decode_ms[i] = timed_call(lambda: decode_rgb_224(data))
+            batch.append((i, rgb))
+        except Exception as exc:
+            batch.append((i, error_result(exc)))
+    return [result for _, result in run_batch(batch, _predict_arrays, decode_ms)]
+
+
+class ShardedPredictor:
+    """
+    Pool of worker processes that each hold a memory-mapped detector.
+
+    Batches are sharded across workers and results are merged back in
+    input order.
+    """
+
+    def __init__(
+        self,
+        workers: int = PROCESS_WORKERS,
+        threads_per_worker: int = THREADS_PER_WORKER,
+        max_in_flight: int | None = None,
+    ):
+        _check_shared_weights(BACKEND, resolve_cpu_mode(CPU_MODE))
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.max_in_flight = max_in_flight or 2 * workers
+        # spawn: forking a process that already started torch's thread pools
+        # can deadlock.
+        self._pool = mp.get_context("spawn").Pool(
+            workers, initializer=_init_worker, initargs=(threads_per_worker,)
+        )
+
+    def iter_batches(
+        self, handles: Sequence, batch_size: int
+    ) -> Iterator[list[tuple[int, dict]]]:
+        """Same contract as `inference.pipeline.pipelined_batches`."""
+        starts = iter(range(0, len(handles), batch_size))
+        in_flight = deque()
+
+        def submit():
+            while len(in_flight) < self.max_in_flight:
+                start = next(starts, None)
+                if start is None:
+                    return
+                datas = [h.getvalue() for h in handles[start : start + batch_size]]
+                in_flight.append((start, self._pool.apply_async(_run_shard, (datas,))))
+
+        submit()
+        while in_flight:
+            start, pending = in_flight.popleft()
+            results = pending.get()
+            submit()
+            yield list(enumerate(results, start))
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+# Backends and CPU modes that run the memory-mapped weights in place.
+SHARED_WEIGHT_BACKENDS = ("eager", "compile")
+SHARED_WEIGHT_CPU_MODES = ("fp32",)
+
+
+def _check_shared_weights(backend: str, cpu_mode: str):
+    if backend not in SHARED_WEIGHT_BACKENDS or cpu_mode not in SHARED_WEIGHT_CPU_MODES:
+        raise ValueError(
+            f"SPOOF_PROCESS_WORKERS needs a backend in {SHARED_WEIGHT_BACKENDS} and a CPU "
+            f"mode in {SHARED_WEIGHT_CPU_MODES} (got {backend!r}, {cpu_mode!r}); the others "
+            "copy the weights into every worker"
+        )
+
+
+_sharded: ShardedPredictor | None = None
+_sharded_lock = threading.Lock()
+
+
+def get_sharded_predictor() -> ShardedPredictor | None:
+    """Process-wide pool, or None when `PROCESS_WORKERS` is 0."""
+    global _sharded
+    if _sharded is None and PROCESS_WORKERS > 0:
+        with _sharded_lock:
+            if _sharded is None:
+                _sharded = ShardedPredictor()
+                atexit.register(_sharded.close)
+    return _sharded
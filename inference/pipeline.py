@@ -0,0 +1,127 @@
+"""
+Streaming decode → inference pipeline.
+
+A thread pool decodes images into 224x224 arrays (PIL and OpenCV release
+the GIL while decoding) while the calling thread stacks ready arrays into
+batches and runs the model, whose preprocessing lives in the graph. At
+most `max_queued` decoded images wait at any time, and each handle drops
+its decoded array once its batch has run, so memory stays bounded however
+many files are fed in. Results come back in input order, and a
+file that fails to decode yields an error result instead of aborting the
+run.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Sequence
+
+import numpy as np
+
+from inference.handle import ImageHandle
+
+
+def error_result(exc: BaseException) -> dict:
+    """Result dict for a file that could not be analyzed."""
+    return {
+        "label": "error",
+        "confidence": 0.0,
+        "details": {"error": f"{type(exc).__name__}: {exc}"},
+    }
+
+
+def is_error(result: dict) -> bool:
+    return result["label"] == "error"
+
+
+def pipelined_batches(
+    handles: Sequence[ImageHandle],
+    infer: Callable[[np.ndarray], list[dict]],
+    batch_size: int,
+    workers: int,
+    max_queued: int | None = None,
+) -> Iterator[list[tuple[int, dict]]]:
+    """
+    Decode `handles` on `workers` threads and run `infer` on batches.
+
+    Args:
+        handles: Images to analyze.
+        infer: Maps a (N,224,224,3) uint8 batch to N result dicts.
+        batch_size: Decoded images per `infer` call.
+        workers: Decode threads.
+        max_queued: Bound on decoded-but-not-inferred images
+            (backpressure). Defaults to two batches.
+
+    Yields:
+        One list of (index into `handles`, result) per batch, in input
+        order. Decode failures and failed batches yield `error_result`s.
+    """
+    if max_queued is None:
+        max_queued = 2 * batch_size
+    max_queued = max(max_queued, batch_size)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as pool:
+        queued: deque[tuple[int, Future]] = deque()
+        next_idx = 0
+
+        def fill():
+            nonlocal next_idx
+            while len(queued) < max_queued and next_idx < len(handles):
+                queued.append((next_idx, pool.submit(timed_call, handles[next_idx].rgb_224)))
+                next_idx += 1
+
+        batch: list[tuple[int, np.ndarray | dict]] = []
+        decode_ms: dict[int, float] = {}
+        fill()
+        while queued:
+            idx, future = queued.popleft()
+            try:
+                rgb, decode_ms[idx] = future.result()
+                batch.append((idx, rgb))
+            except Exception as exc:
+                batch.append((idx, error_result(exc)))
+            fill()
+
+            ready = sum(1 for _, item in batch if isinstance(item, np.ndarray))
+            if ready == batch_size or not queued:
+                results = run_batch(batch, infer, decode_ms)
+                for i, _ in batch:
+                    handles[i].release_pixels()
+                batch = []
+                yield results
+                decode_ms = {}
+
+
+def run_batch(
+    batch: list[tuple[int, np.ndarray | dict]],
+    infer: Callable[[np.ndarray], list[dict]],
+    decode_ms: dict[int, float] | None = None,
+) -> list[tuple[int, dict]]:
+    """
+    Run `infer` on the decoded arrays of a batch, keeping errors in place.
+    `decode_ms` (by batch index) is added to each result's timings.
+    """
+    arrays = [item for _, item in batch if isinstance(item, np.ndarray)]
+    if arrays:
+        try:
+            inferred = iter(infer(np.stack(arrays)))
+        except Exception as exc:
+            inferred = iter([error_result(exc) for _ in arrays])
+    results = [
+        (idx, next(inferred) if isinstance(item, np.ndarray) else item)
+        for idx, item in batch
+    ]
+    if decode_ms:
+        for idx, result in results:
+            if idx in decode_ms and not is_error(result):
+                result["details"].setdefault("timings_ms", {})["decode"] = round(decode_ms[idx], 3)
+    return results
+
+
+def timed_call(fn: Callable[[], object]) -> tuple[object, float]:
+    """``(fn(), elapsed ms)``."""
+    start = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - start) * 1000
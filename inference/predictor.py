@@ -0,0 +1,409 @@
+"""
+Prediction entry points used by the UI.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Iterator, Sequence
+
+import numpy as np
+import torch
+from torch.nn import functional as F
+
+from inference.backends import LOSSY_BACKENDS, build_backend
+from inference.branches import with_branch_strategy
+from inference.cache import ResultCache, copy_result
+from inference.cascade import build_screener, run_cascade
+from inference.checkpoint import checkpoint_fingerprint, load_model
+from inference.cpu_mode import apply_cpu_mode, resolve_cpu_mode
+from inference.fusion import fusion_tag, with_fusion_mode
+from inference.handle import ImageHandle
+from inference.instrument import instrument
+from inference.metrics import (
+    CACHE_LOOKUPS,
+    CASCADE_DECISIONS,
+    PREDICTIONS,
+    collect_timings,
+    observe_batch,
+)
+from inference.config import (
+    BACKEND,
+    BRANCH_STRATEGY,
+    BYTES_PER_SAMPLE,
+    CASCADE,
+    CASCADE_SIZE,
+    CASCADE_THRESHOLD,
+    CPU_MODE,
+    DECODE_WORKERS,
+    FUSION_GRID,
+    FUSION_MODE,
+    HIGHPASS_ENGINE,
+    MAX_BATCH_SIZE,
+    MEMORY_BUDGET_MB,
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_MAX_MB,
+    RESULT_STORE_MAX_ENTRIES,
+    RESULT_STORE_PATH,
+    RESULT_STORE_TTL_DAYS,
+    WARMUP_BATCH_SIZES,
+    device,
+)
+from inference.model import SpoofDetector
+from inference.multiproc import get_sharded_predictor
+from inference.pipeline import is_error, pipelined_batches
+from inference.preprocess import Preprocess
+from inference.profiling import batch_profiler
+from inference.store import ResultStore
+
+if TYPE_CHECKING:
+    from streamlit.runtime.uploaded_file_manager import UploadedFile
+
+
+result_cache = ResultCache(
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=RESULT_CACHE_MAX_MB * 1024 * 1024,
+)
+
+_result_store: ResultStore | None = None
+_detector: SpoofDetector | None = None
+_backend = None
+_screener = None
+_init_lock = threading.Lock()
+
+
+def get_detector() -> SpoofDetector:
+    """Return the process-wide detector, loading it on first use."""
+    global _detector
+    if _detector is None:
+        with _init_lock:
+            if _detector is None:
+                model = with_fusion_mode(load_model(), FUSION_MODE, FUSION_GRID)
+                model = with_branch_strategy(model, BRANCH_STRATEGY)
+                detector = SpoofDetector(Preprocess(size=224, r=8), model).to(device).eval()
+                _detector = instrument(apply_cpu_mode(detector, cpu_mode()))
+    return _detector
+
+
+def get_backend():
+    """Return the process-wide inference backend selected by `BACKEND`."""
+    global _backend
+    if _backend is None:
+        detector = get_detector()
+        with _init_lock:
+            if _backend is None:
+                _backend = build_backend(BACKEND, detector, artifact_key(), cpu_mode())
+    return _backend
+
+
+def get_screener():
+    """Return the process-wide cascade screener selected by `CASCADE`."""
+    global _screener
+    if _screener is None:
+        detector = get_detector()
+        with _init_lock:
+            if _screener is None:
+                _screener = build_screener(
+                    CASCADE, detector, checkpoint_fingerprint(), CASCADE_SIZE, cpu_mode()
+                )
+    return _screener
+
+
+def warmup(batch_sizes: Sequence[int] = WARMUP_BATCH_SIZES):
+    """
+    Run dummy forward passes so the first real request is not the slow one.
+    Builds the cascade screener too, so a missing probe fails here.
+    """
+    backend = get_backend()
+    screener = get_screener() if CASCADE else None
+    with torch.no_grad():
+        for n in batch_sizes:
+            x = torch.zeros((n, 224, 224, 3), dtype=torch.uint8, device=device)
+            backend(x)
+            if screener is not None:
+                screener(x)
+
+
+def predict(uploaded_file: UploadedFile | ImageHandle) -> dict:
+    """
+    Run spoof/real prediction on a single uploaded image.
+
+    Args:
+        uploaded_file: A Streamlit UploadedFile object (image) or an
+            ImageHandle wrapping one.
+
+    Returns:
+        dict with the following keys:
+            - "label"      : str   → "real" or "spoof"
+            - "confidence" : float → confidence score between 0.0 and 1.0
+            - "details"    : dict  → "cache_hit", "batch_size" and
+              per-stage "timings_ms" (for a cache hit, those of the run
+              that produced the result), and "decided_by" /
+              "screen_confidence" when the cascade is on
+
+    Example return:
+        {
+            "label": "real",
+            "confidence": 0.97,
+            "details": {
+                "cache_hit": False,
+                "batch_size": 1,
+                "timings_ms": {"decode": 6.1, "preprocess": 2.3, "fft": 1.2,
+                               "vgg_rgb": 134.0, "vgg_fft": 176.2, "fusion": 100.5,
+                               "head": 0.1, "model": 414.0, "postprocess": 0.1},
+            },
+        }
+    """
+    return predict_batch([uploaded_file], batch_size=1)[0]
+
+
+def auto_batch_size(memory_budget_mb: int | None = None) -> int:
+    """Largest batch size whose estimated activations fit the memory budget."""
+    if memory_budget_mb is None:
+        memory_budget_mb = MEMORY_BUDGET_MB
+    budget = memory_budget_mb * 1024 * 1024
+    return int(max(1, min(MAX_BATCH_SIZE, budget // BYTES_PER_SAMPLE)))
+
+
+def predict_batch(
+    files: Sequence[UploadedFile | ImageHandle],
+    batch_size: int | None = None,
+    memory_budget_mb: int | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    use_cache: bool = True,
+) -> list[dict]:
+    """
+    Run spoof/real prediction on many uploaded images at once.
+
+    Images are decoded on a thread pool and stacked into (N,3,224,224)
+    batches so the VGG trunks and the fusion block run at batch size N
+    instead of 1. Images already in the result cache skip decoding and
+    preprocessing entirely.
+
+    Args:
+        files: Sequence of Streamlit UploadedFile objects or ImageHandles.
+        batch_size: Images per forward pass. Picked from the memory
+            budget with `auto_batch_size` when omitted.
+        memory_budget_mb: Activation budget used to pick the batch size.
+            Defaults to `MEMORY_BUDGET_MB`.
+        progress_callback: Called as `progress_callback(done, total)`
+            after every batch.
+        use_cache: Look results up in, and add them to, `result_cache`
+            and the persistent result store (keyed by content hash and
+            model fingerprint).
+
+    Returns:
+        List of result dicts (same format as `predict`), in input order.
+        Files that cannot be analyzed get ``label == "error"`` with the
+        reason in ``details["error"]``.
+    """
+    return [
+        result
+        for _, result in iter_predict(
+            files,
+            batch_size=batch_size,
+            memory_budget_mb=memory_budget_mb,
+            progress_callback=progress_callback,
+            use_cache=use_cache,
+        )
+    ]
+
+
+def iter_predict(
+    files: Sequence[UploadedFile | ImageHandle],
+    batch_size: int | None = None,
+    memory_budget_mb: int | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    use_cache: bool = True,
+    decode_workers: int = DECODE_WORKERS,
+) -> Iterator[tuple[int, dict]]:
+    """
+    Streaming form of `predict_batch`: yields ``(index, result)`` pairs in
+    input order as soon as each result and all before it are known.
+
+    Decoding runs on `decode_workers` threads ahead of the model through
+    `inference.pipeline.pipelined_batches`, with bounded look-ahead. With
+    ``SPOOF_PROCESS_WORKERS`` set, batches are sharded across worker
+    processes instead (`inference.multiproc`).
+    """
+    if batch_size is None:
+        batch_size = auto_batch_size(memory_budget_mb)
+    batch_size = max(1, int(batch_size))
+
+    total = len(files)
+    ready: dict[int, dict] = {}
+
+    # Cache lookup; identical bytes under different names are inferred once.
+    model = model_fingerprint() if use_cache else ""
+    pending: dict[str, list[int]] = {}
+    handles = [ImageHandle.from_upload(f) for f in files]
+    for idx, handle in enumerate(handles):
+        h = handle.content_hash
+        cached = result_cache.get(_cache_key(model, h)) if use_cache else None
+        if cached is not None:
+            cached["details"]["cache_hit"] = True
+            ready[idx] = cached
+            CACHE_LOOKUPS.inc(1, "memory")
+        else:
+            pending.setdefault(h, []).append(idx)
+
+    # Persistent store: one bulk query for everything the memory cache missed.
+    store = get_result_store() if use_cache and pending else None
+    if store is not None:
+        for h, result in store.get_many(model, pending).items():
+            result_cache.put(_cache_key(model, h), result)
+            result["details"]["cache_hit"] = True
+            for idx in pending.pop(h):
+                ready[idx] = copy_result(result)
+                CACHE_LOOKUPS.inc(1, "store")
+    if use_cache:
+        CACHE_LOOKUPS.inc(sum(map(len, pending.values())), "miss")
+
+    done = len(ready)
+    if done and progress_callback is not None:
+        progress_callback(done, total)
+
+    next_idx = 0
+
+    def drain():
+        nonlocal next_idx
+        while next_idx in ready:
+            result = ready.pop(next_idx)
+            PREDICTIONS.inc(1, result["label"])
+            yield next_idx, result
+            next_idx += 1
+
+    yield from drain()
+
+    todo = list(pending.items())
+    unique = [handles[idxs[0]] for _, idxs in todo]
+    sharded = get_sharded_predictor()
+    if sharded is not None:
+        batches = sharded.iter_batches(unique, batch_size)
+    else:
+        batches = pipelined_batches(unique, _predict_arrays, batch_size, decode_workers)
+    for batch in batches:
+        observe_batch([result for _, result in batch if not is_error(result)])
+        stored = []
+        for j, result in batch:
+            h, idxs = todo[j]
+            result["details"]["cache_hit"] = False
+            if use_cache and not is_error(result):
+                cacheable = _without_run_details(result)
+                result_cache.put(_cache_key(model, h), cacheable)
+                stored.append((h, cacheable))
+            for idx in idxs:
+                ready[idx] = copy_result(result)
+            done += len(idxs)
+        if store is not None and stored:
+            store.put_many(model, stored)
+        if progress_callback is not None:
+            progress_callback(done, total)
+        yield from drain()
+
+
+def cpu_mode() -> str:
+    """The `CPU_MODE` this host runs, with "auto" resolved."""
+    return resolve_cpu_mode(CPU_MODE)
+
+
+def model_fingerprint() -> str:
+    """
+    Identifies the weights and settings that determine a prediction.
+
+    Keyed on the backend actually built, not the configured one: a lossy
+    backend or bf16 autocast that fell back to eager caches its results
+    as eager.
+    """
+    key = artifact_key()
+    backend = get_backend().name
+    if backend in LOSSY_BACKENDS:
+        key = f"{key}-{backend}"
+    elif backend.endswith("+bf16"):
+        key = f"{key}-bf16"
+    if CASCADE:
+        screener = f"downscale{CASCADE_SIZE}" if CASCADE == "downscale" else CASCADE
+        if cpu_mode() == "bf16":
+            screener += "+bf16"
+        key = f"{key}-cascade-{screener}@{CASCADE_THRESHOLD:g}"
+    return key
+
+
+def artifact_key() -> str:
+    """Identifies the weights, preprocessing and fusion; names compiled artifacts."""
+    key = f"{checkpoint_fingerprint()}-{HIGHPASS_ENGINE}"
+    tag = fusion_tag(FUSION_MODE, FUSION_GRID)
+    return f"{key}-{tag}" if tag else key
+
+
+def _cache_key(model: str, h: str) -> str:
+    return f"{model}:{h}"
+
+
+# Details that only make sense for the current run; never cached. The
+# timings and batch size are kept: they describe the inference that
+# produced the cached result.
+_RUN_DETAILS = ("cache_hit", "profile_trace")
+
+
+def _without_run_details(result: dict) -> dict:
+    result = copy_result(result)
+    for key in _RUN_DETAILS:
+        result["details"].pop(key, None)
+    return result
+
+
+def get_result_store() -> ResultStore | None:
+    """Return the process-wide persistent store, or None when disabled."""
+    global _result_store
+    if _result_store is None and RESULT_STORE_PATH:
+        with _init_lock:
+            if _result_store is None:
+                _result_store = ResultStore(
+                    RESULT_STORE_PATH,
+                    ttl_seconds=RESULT_STORE_TTL_DAYS * 24 * 3600,
+                    max_entries=RESULT_STORE_MAX_ENTRIES,
+                )
+    return _result_store
+
+
+def _predict_arrays(rgb: np.ndarray) -> list[dict]:
+    """Run the model on a (N,224,224,3) uint8 batch and format the results."""
+    # Outside the timings: these may build on first use.
+    backend = get_backend()
+    screener = get_screener() if CASCADE else None
+    with batch_profiler.capture(len(rgb)) as profile, collect_timings() as timings:
+        with torch.no_grad():
+            x = torch.from_numpy(rgb).to(device)
+            start = time.perf_counter()
+            if screener is None:
+                output = backend(x)
+            else:
+                output, screen_confidence = run_cascade(screener, backend, x, CASCADE_THRESHOLD)
+            model_done = time.perf_counter()
+            probs = F.softmax(output, dim=1)
+            confidence, label = torch.max(probs, 1)
+            confidence, label = confidence.tolist(), label.tolist()
+        timings["model"] = (model_done - start) * 1000
+        timings["postprocess"] = (time.perf_counter() - model_done) * 1000
+
+    timings_ms = {stage: round(ms, 3) for stage, ms in timings.items()}
+    details = {"batch_size": len(rgb), "timings_ms": timings_ms}
+    if "trace" in profile:
+        details["profile_trace"] = profile["trace"]
+    results = [
+        {
+            "label": "real" if lbl == 0 else "spoof",
+            "confidence": conf,
+            "details": {**details, "timings_ms": dict(timings_ms)},
+        }
+        for conf, lbl in zip(confidence, label)
+    ]
+    if screener is not None:
+        for result, screen_conf in zip(results, screen_confidence):
+            decided_by = "screen" if screen_conf >= CASCADE_THRESHOLD else "full"
+            result["details"]["decided_by"] = decided_by
+            result["details"]["screen_confidence"] = screen_conf
+            CASCADE_DECISIONS.inc(1, decided_by)
+    return results
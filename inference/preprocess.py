@@ -0,0 +1,198 @@
+"""
+Image preprocessing: FFT high-pass features and the `Preprocess` module.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import time
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+
+from inference.config import HIGHPASS_ENGINE, IMAGENET_MEAN, IMAGENET_STD
+from inference.instrument import stage_end, stage_start
+
+
+def fft_highpass_preprocess(img_rgb, r=8, eps=1e-8, engine=None):
+    """
+    img_rgb: np.ndarray (224,224,3), uint8 atau float [0,255]
+    return: np.ndarray (224,224,3) float32, normalized [0,1]
+
+    Single-image wrapper around `fft_highpass_batch`.
+    """
+    hpgray = fft_highpass_batch(img_rgb[None], r=r, eps=eps, engine=engine)[0]
+    return np.repeat(hpgray[..., None], 3, axis=2)
+
+
+@functools.lru_cache(maxsize=16)
+def _highpass_mask(h, w, r):
+    """
+    Ideal high-pass mask (radius r) in unshifted rfft2 layout, (h, w//2+1).
+
+    Same frequencies as masking the fftshift-ed spectrum around (h//2, w//2).
+    """
+    fy = (torch.arange(h) + h // 2) % h - h // 2
+    fx = (torch.arange(w // 2 + 1) + w // 2) % w - w // 2
+    dist2 = fy[:, None] ** 2 + fx[None, :] ** 2
+    return (dist2 >= r * r).to(torch.float32)
+
+
+def fft_highpass_batch(imgs_rgb, r=8, eps=1e-8, engine=None):
+    """
+    imgs_rgb: np.ndarray (N,H,W,3), uint8 atau float [0,255]
+    return: np.ndarray (N,H,W) float32, normalized [0,1] per image
+
+    Runs in float32/complex64 with real-input transforms on torch's intra-op
+    thread pool. Agrees with the original float64 complex FFT within
+    |diff| < 1e-3 after normalization, with either `engine`.
+    """
+    imgs_rgb = np.ascontiguousarray(imgs_rgb)
+    if imgs_rgb.dtype != np.uint8:
+        imgs_rgb = imgs_rgb.astype(np.float32)
+    n, h, w, _ = imgs_rgb.shape
+
+    # 1) grayscale, one cv2 call for the whole batch
+    gray = cv2.cvtColor(imgs_rgb.reshape(n * h, w, 3), cv2.COLOR_RGB2GRAY)
+    gray = torch.from_numpy(gray.reshape(n, h, w).astype(np.float32))
+
+    hpgray = _highpass_log_magnitude(gray, r, eps, engine)
+
+    return hpgray.numpy()
+
+
+@functools.lru_cache(maxsize=16)
+def _lowpass_basis(h, w, r):
+    """
+    Separable DFT bases for the frequencies the high-pass mask drops.
+
+    Only |fy|, |fx| < r can fall inside the radius, so the low-pass part is
+    Gh @ ((Fh @ x @ Fw) * M) @ Gw with (2r-1)-wide bases instead of a full
+    h x w transform. Returns (Fh, Fw, M, Gh, Gw) as complex64; the 1/(h*w)
+    inverse scale is folded into Gh.
+    """
+    f = torch.arange(-(r - 1), r, dtype=torch.float64)
+    n_h = torch.arange(h, dtype=torch.float64)
+    n_w = torch.arange(w, dtype=torch.float64)
+
+    ang_h = -2 * math.pi * f[:, None] * n_h[None, :] / h             # (K,h)
+    ang_w = -2 * math.pi * n_w[:, None] * f[None, :] / w             # (w,K)
+    Fh = torch.polar(torch.ones_like(ang_h), ang_h)
+    Fw = torch.polar(torch.ones_like(ang_w), ang_w)
+
+    M = (f[:, None] ** 2 + f[None, :] ** 2 < r * r).to(torch.complex128)
+    Gh = Fh.conj().T / (h * w)                                        # (h,K)
+    Gw = Fw.conj().T                                                  # (K,w)
+
+    return tuple(t.to(torch.complex64) for t in (Fh, Fw, M, Gh, Gw))
+
+
+def _highpass(gray, r, engine=None):
+    """Ideal high-pass (radius r) of (N,H,W) float32 grayscale images."""
+    engine = engine or HIGHPASS_ENGINE
+    h, w = gray.shape[-2:]
+
+    if engine == "lowpass" and 2 * r - 1 <= min(h, w):
+        # image minus its low-frequency reconstruction
+        Fh, Fw, M, Gh, Gw = _lowpass_basis(h, w, r)
+        C = Fh @ gray.to(torch.complex64) @ Fw
+        x_lp = (Gh @ (C * M) @ Gw).real
+        return gray - x_lp
+    if engine not in ("fft", "lowpass"):
+        raise ValueError(f"Unknown high-pass engine: {engine!r}")
+
+    # real FFT2 + ideal high-pass mask + inverse real FFT
+    X = torch.fft.rfft2(gray)
+    X = X * _highpass_mask(h, w, r)
+    return torch.fft.irfft2(X, s=(h, w))
+
+
+def _highpass_log_magnitude(gray, r, eps, engine=None):
+    """Shared FFT stage: (N,H,W) float32 grayscale -> (N,H,W) in [0,1]."""
+    # 2) + 3) ideal high-pass
+    xhp = _highpass(gray, r, engine)
+
+    # 4) magnitude + log
+    hplog = torch.log1p(xhp.abs())
+
+    # 5) normalize [0,1] per image
+    mmin = hplog.amin(dim=(1, 2), keepdim=True)
+    mmax = hplog.amax(dim=(1, 2), keepdim=True)
+    return (hplog - mmin) / (mmax - mmin + eps)
+
+
+def compare_highpass_engines(batch_size=16, size=224, r=8, repeats=5, seed=0):
+    """
+    Time the "fft" and "lowpass" engines on random images and check that
+    they agree. Returns {"fft_ms", "lowpass_ms", "max_abs_diff"}.
+    """
+    rng = np.random.default_rng(seed)
+    imgs = rng.integers(0, 256, size=(batch_size, size, size, 3), dtype=np.uint8)
+
+    report = {}
+    outputs = {}
+    for engine in ("fft", "lowpass"):
+        outputs[engine] = fft_highpass_batch(imgs, r=r, engine=engine)  # warmup
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fft_highpass_batch(imgs, r=r, engine=engine)
+        report[f"{engine}_ms"] = (time.perf_counter() - start) * 1000 / repeats
+    report["max_abs_diff"] = float(np.abs(outputs["fft"] - outputs["lowpass"]).max())
+    return report
+
+
+class Preprocess(nn.Module):
+    """
+    Model-side preprocessing: uint8 (N,H,W,3) RGB -> (x_rgb, x_fft).
+
+    Grayscale, FFT high-pass, log-magnitude and ImageNet normalization all
+    run as batched tensor ops, so they share torch's thread pool with the
+    network and can be exported together with it. Grayscale uses OpenCV's
+    fixed-point RGB2GRAY weights so results match `fft_highpass_batch`.
+    """
+
+    def __init__(self, size=224, r=8, eps=1e-8, engine=None):
+        super().__init__()
+        self.size = size
+        self.r = r
+        self.eps = eps
+        self.engine = engine
+        # `inference.cpu_mode` switches this to channels_last for its NHWC modes.
+        self.memory_format = torch.contiguous_format
+        # Non-persistent buffers keep FullModel checkpoints loadable as-is.
+        self.register_buffer("mean", IMAGENET_MEAN.clone(), persistent=False)
+        self.register_buffer("std", IMAGENET_STD.clone(), persistent=False)
+        self.register_buffer(
+            "gray_weights",
+            torch.tensor([9798, 19235, 3735], dtype=torch.int32).view(3, 1, 1),
+            persistent=False,
+        )
+
+    def forward(self, x):
+        x = x.permute(0, 3, 1, 2)                         # (N,3,H,W) uint8
+        start = stage_start()
+        hpgray = self.highpass(x)
+        stage_end("fft", start)
+        x_rgb, x_fft = self.normalize(x, hpgray)
+        return (
+            x_rgb.contiguous(memory_format=self.memory_format),
+            x_fft.contiguous(memory_format=self.memory_format),
+        )
+
+    def highpass(self, x):
+        """(N,3,H,W) uint8 -> (N,H,W) high-pass log-magnitude of its grayscale."""
+        gray = (x.to(torch.int32) * self.gray_weights).sum(dim=1)
+        gray = ((gray + 16384) // 32768).to(torch.float32)  # (N,H,W)
+        return _highpass_log_magnitude(gray, self.r, self.eps, self.engine)
+
+    def normalize(self, x, hpgray):
+        """
+        ImageNet-normalized (x_rgb, x_fft) from the (N,3,H,W) uint8 `x` and
+        its `highpass` output, repeated over the three channels.
+        """
+        x_rgb = (x.to(torch.float32) / 255.0 - self.mean) / self.std
+        x_fft = (hpgray.unsqueeze(1).expand(-1, 3, -1, -1) - self.mean) / self.std
+        return x_rgb, x_fft
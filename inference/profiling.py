@@ -0,0 +1,116 @@
+"""
+Opt-in PyTorch profiling of slow or sampled batches.
+
+Off by default. Turn it on with ``SPOOF_PROFILE=1`` or from the admin
+panel in the UI (``SPOOF_ADMIN_UI=1``). While on, each model batch is
+considered for capture:
+
+- ``SPOOF_PROFILE_SAMPLE_RATE``: fraction of batches always captured.
+- ``SPOOF_PROFILE_THRESHOLD_MS``: when > 0, every batch runs under the
+  profiler and is kept only if it took at least this long. That costs
+  profiler overhead on each batch while profiling is on, and nothing
+  once it is off.
+
+A kept capture writes a trace through `torch.profiler`'s
+``tensorboard_trace_handler`` (``<name>.<ns>.pt.trace.json``; view it
+with ``tensorboard --logdir`` and the torch-tb-profiler plugin, or open
+it in chrome://tracing or Perfetto) and ``<name>.summary.txt`` (top
+operators by self CPU time, grouped by input shape) into
+``SPOOF_PROFILE_DIR``. Only the newest ``SPOOF_PROFILE_KEEP`` captures
+are kept. Only one batch is profiled at a time; concurrent batches run
+unprofiled.
+
+The switch is per process. The admin panel flips it in the Streamlit
+process only; worker processes (``SPOOF_PROCESS_WORKERS``) and a remote
+service each follow their own ``SPOOF_PROFILE*`` environment.
+
+Importing this module does not import torch.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+TOP_OPERATORS = 25
+
+
+class BatchProfiler:
+    """Per-process profiling switch and capture policy."""
+
+    def __init__(self):
+        self.enabled = os.environ.get("SPOOF_PROFILE", "") == "1"
+        self.threshold_ms = float(os.environ.get("SPOOF_PROFILE_THRESHOLD_MS", "1000"))
+        self.sample_rate = float(os.environ.get("SPOOF_PROFILE_SAMPLE_RATE", "0"))
+        self.directory = Path(os.environ.get("SPOOF_PROFILE_DIR", "models/profiles"))
+        self.keep = int(os.environ.get("SPOOF_PROFILE_KEEP", "20"))
+        self._busy = threading.Lock()
+
+    @contextlib.contextmanager
+    def capture(self, batch_size: int) -> Iterator[dict]:
+        """
+        Profile the block if the policy says so. The yielded dict gets
+        ``"trace"`` (the trace path) when the capture is kept.
+        """
+        info: dict = {}
+        sampled = self.enabled and random.random() < self.sample_rate
+        wanted = sampled or (self.enabled and self.threshold_ms > 0)
+        if not wanted or not self._busy.acquire(blocking=False):
+            yield info
+            return
+
+        from torch.profiler import ProfilerActivity, profile
+
+        try:
+            with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+                start = time.perf_counter()
+                yield info
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            if sampled or elapsed_ms >= self.threshold_ms:
+                info["trace"] = str(self._save(prof, elapsed_ms, batch_size))
+        finally:
+            self._busy.release()
+
+    def _save(self, prof, elapsed_ms: float, batch_size: int) -> Path:
+        from torch.profiler import tensorboard_trace_handler
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = (
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed_ms)}ms-b{batch_size}"
+            f"-p{os.getpid()}"
+        )
+        tensorboard_trace_handler(str(self.directory), worker_name=name)(prof)
+        trace = next(self.directory.glob(f"{name}.*.pt.trace.json"))
+        summary = prof.key_averages(group_by_input_shape=True).table(
+            sort_by="self_cpu_time_total", row_limit=TOP_OPERATORS
+        )
+        (self.directory / f"{name}.summary.txt").write_text(
+            f"batch of {batch_size}, {elapsed_ms:.1f} ms\n\n{summary}\n"
+        )
+        logger.info("Profiled a %.0f ms batch of %d: %s", elapsed_ms, batch_size, trace)
+        self._rotate()
+        return trace
+
+    def _rotate(self):
+        traces = sorted(self.directory.glob("*.pt.trace.json"), key=os.path.getmtime)
+        for old in traces[: max(0, len(traces) - self.keep)]:
+            old.unlink(missing_ok=True)
+            old.with_name(old.name.split(".", 1)[0] + ".summary.txt").unlink(missing_ok=True)
+
+    def recent(self, n: int = 5) -> list[Path]:
+        """The newest `n` summaries, newest first."""
+        if not self.directory.exists():
+            return []
+        summaries = sorted(self.directory.glob("*.summary.txt"), key=os.path.getmtime)
+        return summaries[::-1][:n]
+
+
+batch_profiler = BatchProfiler()
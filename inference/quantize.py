@@ -0,0 +1,195 @@
+"""
+INT8 quantized inference.
+
+- VGG trunks: static post-training quantization (FX graph mode, x86
+  backend) calibrated on a local folder of images.
+- Attention fusion and classifier head: dynamic INT8 quantization of
+  every Linear. `nn.MultiheadAttention` keeps its input projection as a
+  raw parameter and marks its output projection non-quantizable, so each
+  attention block is first rebuilt as `LinearMultiheadAttention`, an
+  equivalent module with plain Linear projections.
+
+The quantized detector is traced and saved as TorchScript next to the
+other compiled artifacts, where the "int8" backend picks it up:
+
+    python -m inference quantize --calibration data/calib --holdout data/val
+
+The holdout folder uses ImageFolder layout (``real/`` and ``spoof/``
+subfolders); the report compares fp32 and INT8 accuracy on it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.nn import functional as F
+
+from inference.backends import write_atomic
+from inference.decode import decode_rgb_224
+from inference.model import SpoofDetector
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+LABELS = {"real": 0, "spoof": 1}
+
+
+class LinearMultiheadAttention(nn.Module):
+    """
+    Drop-in for a sequence-first `nn.MultiheadAttention` (no masks) with
+    separate q/k/v/out `nn.Linear` projections, so they can be quantized.
+    """
+
+    def __init__(self, mha: nn.MultiheadAttention):
+        super().__init__()
+        C = mha.embed_dim
+        self.num_heads = mha.num_heads
+        self.q_proj = nn.Linear(C, C)
+        self.k_proj = nn.Linear(C, C)
+        self.v_proj = nn.Linear(C, C)
+        self.out_proj = nn.Linear(C, C)
+
+        weights = mha.in_proj_weight.detach().chunk(3)
+        biases = mha.in_proj_bias.detach().chunk(3)
+        with torch.no_grad():
+            for proj, w, b in zip((self.q_proj, self.k_proj, self.v_proj), weights, biases):
+                proj.weight.copy_(w)
+                proj.bias.copy_(b)
+            self.out_proj.weight.copy_(mha.out_proj.weight)
+            self.out_proj.bias.copy_(mha.out_proj.bias)
+
+    def forward(self, query, key, value, need_weights=False):
+        L, B, C = query.shape
+        S = key.shape[0]
+        h = self.num_heads
+        q = self.q_proj(query).view(L, B, h, C // h).permute(1, 2, 0, 3)  # (B,h,L,d)
+        k = self.k_proj(key).view(S, B, h, C // h).permute(1, 2, 0, 3)
+        v = self.v_proj(value).view(S, B, h, C // h).permute(1, 2, 0, 3)
+        out = F.scaled_dot_product_attention(q, k, v)
+        out = out.permute(2, 0, 1, 3).reshape(L, B, C)
+        return self.out_proj(out), None
+
+
+def quantize_detector(
+    detector: SpoofDetector, calibration: Iterable[np.ndarray]
+) -> SpoofDetector:
+    """
+    Return an INT8 copy of `detector`.
+
+    Args:
+        detector: fp32 detector (left untouched).
+        calibration: (N,224,224,3) uint8 batches used to calibrate the
+            static activation ranges of the VGG trunks.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    torch.backends.quantized.engine = "x86"
+    qdet = copy.deepcopy(detector).eval()
+    model = qdet.model
+
+    qconfig_mapping = get_default_qconfig_mapping("x86")
+    example = (torch.randn(1, 3, 224, 224),)
+    vgg_rgb = prepare_fx(model.vgg_rgb, qconfig_mapping, example)
+    vgg_fft = prepare_fx(model.vgg_fft, qconfig_mapping, example)
+    with torch.no_grad():
+        for rgb in calibration:
+            x_rgb, x_fft = qdet.preprocess(torch.from_numpy(rgb))
+            vgg_rgb(x_rgb)
+            vgg_fft(x_fft)
+    model.vgg_rgb = convert_fx(vgg_rgb)
+    model.vgg_fft = convert_fx(vgg_fft)
+
+    fusion = model.fusion
+    fusion.attn_rgb_from_fft = LinearMultiheadAttention(fusion.attn_rgb_from_fft)
+    fusion.attn_fft_from_rgb = LinearMultiheadAttention(fusion.attn_fft_from_rgb)
+    model.fusion = quantize_dynamic(fusion, {nn.Linear}, dtype=torch.qint8)
+    model.head = quantize_dynamic(model.head, {nn.Linear}, dtype=torch.qint8)
+    return qdet
+
+
+def save_quantized(qdetector: SpoofDetector, path: str | Path) -> Path:
+    """Trace the quantized detector and save it as TorchScript."""
+    path = Path(path)
+    example = torch.randint(0, 256, (2, 224, 224, 3), dtype=torch.uint8)
+    with torch.no_grad():
+        traced = torch.jit.trace(qdetector, example, check_trace=False)
+    write_atomic(path, traced.save)
+    return path
+
+
+def iter_image_batches(folder: str | Path, batch_size: int = 16) -> Iterator[np.ndarray]:
+    """Decode every image under `folder` into (N,224,224,3) uint8 batches."""
+    batch = []
+    for path in sorted(Path(folder).rglob("*")):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        batch.append(decode_rgb_224(path.read_bytes()))
+        if len(batch) == batch_size:
+            yield np.stack(batch)
+            batch = []
+    if batch:
+        yield np.stack(batch)
+
+
+def evaluate_folder(models: dict, folder: str | Path, batch_size: int = 16) -> dict:
+    """
+    Accuracy and latency of each model on an ImageFolder-style folder
+    (``real/``, ``spoof/``). `models` maps a name to a callable from a
+    uint8 (N,224,224,3) tensor to logits.
+    """
+    report = {name: {"correct": 0, "seconds": 0.0} for name in models}
+    total = 0
+    for label_name, label in LABELS.items():
+        for rgb in iter_image_batches(Path(folder) / label_name, batch_size):
+            x = torch.from_numpy(rgb)
+            total += len(rgb)
+            for name, fn in models.items():
+                start = time.perf_counter()
+                with torch.no_grad():
+                    pred = fn(x).argmax(dim=1)
+                report[name]["seconds"] += time.perf_counter() - start
+                report[name]["correct"] += int((pred == label).sum())
+    for stats in report.values():
+        stats["accuracy"] = stats["correct"] / total if total else float("nan")
+        stats["ms_per_image"] = stats["seconds"] * 1000 / total if total else float("nan")
+    report["images"] = total
+    return report
+
+
+def _state_dict_mb(module: nn.Module) -> float:
+    return sum(
+        t.numel() * t.element_size()
+        for t in module.state_dict().values()
+        if isinstance(t, torch.Tensor)
+    ) / 1e6
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--calibration", required=True, help="folder of calibration images")
+    parser.add_argument("--holdout", help="ImageFolder-style folder (real/, spoof/) for the accuracy report")
+    parser.add_argument("--out", help="output TorchScript path (default: the int8 backend's artifact)")
+    parser.add_argument("--batch-size", type=int, default=16)
+
+
+def run(args: argparse.Namespace) -> int:
+    from inference.backends import int8_artifact
+    from inference.predictor import artifact_key, get_detector
+
+    detector = get_detector()
+    qdetector = quantize_detector(detector, iter_image_batches(args.calibration, args.batch_size))
+    out = save_quantized(qdetector, args.out or int8_artifact(artifact_key()))
+    print(f"Saved {out} ({out.stat().st_size / 1e6:.1f} MB; fp32 weights {_state_dict_mb(detector):.1f} MB)")
+
+    if args.holdout:
+        quantized = torch.jit.load(str(out))
+        report = evaluate_folder({"fp32": detector, "int8": quantized}, args.holdout, args.batch_size)
+        report["accuracy_delta"] = report["int8"]["accuracy"] - report["fp32"]["accuracy"]
+        print(json.dumps(report, indent=2))
+    return 0
@@ -0,0 +1,69 @@
+"""
+Background model loading with a readiness state.
+
+Importing this module is cheap: torch, torchvision and the checkpoint are
+only touched on the loader thread, so a UI can render while the model
+loads and warms up.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from inference import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader:
+    """Loads and warms up the process-wide detector on a background thread."""
+
+    def __init__(self):
+        self.state = "idle"            # idle → loading → ready | error
+        self.error: BaseException | None = None
+        self.load_seconds: float | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self) -> ModelLoader:
+        """Start loading if it has not been started yet. Returns immediately."""
+        with self._lock:
+            if self._thread is None:
+                metrics.start_file_writer()
+                self.state = "loading"
+                self._thread = threading.Thread(
+                    target=self._load, name="model-loader", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until loading finished; True if the model is ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            from inference.predictor import get_backend, warmup
+
+            get_backend()
+            warmup()
+        except Exception as exc:
+            logger.exception("Model loading failed")
+            self.error = exc
+            self.state = "error"
+        else:
+            self.load_seconds = time.perf_counter() - start
+            metrics.MODEL_LOAD_SECONDS.set(self.load_seconds)
+            self.state = "ready"
+            logger.info("Model ready in %.2fs", self.load_seconds)
+        finally:
+            self._done.set()
@@ -0,0 +1,204 @@
+"""
+Headless batch scanning: ``python -m inference scan <dir|glob|file> ...``.
+
+Paths are walked lazily and fed through `iter_predict` in chunks, so a
+scan of hundreds of thousands of images holds only one chunk of file
+bytes at a time. One JSON line is written per image:
+
+    {"path": ..., "hash": ..., "label": "real" | "spoof" | "error",
+     "confidence": ..., "details": {...},
+     "timings": {"read_ms": ..., "latency_ms": ...}}
+
+``latency_ms`` runs from the start of the image's chunk to its result.
+With ``--output``, the output file doubles as the checkpoint: rerunning
+the same command skips every path already written and appends the rest.
+Paths that failed are retried, so the last line for a path wins. Only
+finished chunks are flushed, and a torn last line from an interrupted
+run is dropped; a file with any other unreadable line is refused. Results also land in the persistent result
+store, so re-scanned bytes are not inferred twice.
+
+Nothing here imports Streamlit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from inference import metrics
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+# Every line `_line` writes starts with this.
+RECORD_PREFIX = b'{"path": '
+
+
+def iter_image_paths(targets: Iterable[str]) -> Iterator[str]:
+    """Image files under each target (directory, glob or file), lazily."""
+    for target in targets:
+        if os.path.isdir(target):
+            for root, dirs, files in os.walk(target):
+                dirs.sort()
+                for name in sorted(files):
+                    if Path(name).suffix.lower() in IMAGE_SUFFIXES:
+                        yield os.path.join(root, name)
+        elif glob.has_magic(target):
+            for path in glob.iglob(target, recursive=True):
+                if os.path.isfile(path) and Path(path).suffix.lower() in IMAGE_SUFFIXES:
+                    yield path
+        else:
+            yield target
+
+
+def load_checkpoint(output: Path) -> set[str]:
+    """
+    Paths already scanned successfully into `output`.
+
+    A torn last line (no trailing newline) left by an interrupted run is
+    truncated away so appended lines stay valid JSON. Any other line that
+    is not a scan result raises ValueError, so a corrupt or unrelated file
+    is never cut down. Files that failed are left out of the result and
+    are retried; their new line follows the old one.
+    """
+    if not output.exists():
+        return set()
+    done = set()
+    valid_bytes = 0
+    with open(output, "rb") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.endswith(b"\n"):
+                if not line.startswith(RECORD_PREFIX):
+                    raise ValueError(f"{output}:{lineno}: not a scan result line")
+                break
+            try:
+                record = json.loads(line)
+                path, label = record["path"], record["label"]
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(f"{output}:{lineno}: not a scan result line") from None
+            if label != "error":
+                done.add(path)
+            valid_bytes += len(line)
+    if valid_bytes < output.stat().st_size:
+        with open(output, "r+b") as f:
+            f.truncate(valid_bytes)
+    return done
+
+
+def scan(
+    targets: Iterable[str],
+    out: IO[str],
+    done: set[str] = frozenset(),
+    chunk_size: int = 64,
+    batch_size: int | None = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Predict every image under `targets` not in `done`, writing JSON lines
+    to `out`. Returns counts and throughput.
+    """
+    from inference.pipeline import error_result, is_error
+    from inference.predictor import iter_predict
+    from inference.handle import ImageHandle
+
+    stats = {"scanned": 0, "skipped": 0, "errors": 0}
+
+    def todo():
+        for path in iter_image_paths(targets):
+            if path in done:
+                stats["skipped"] += 1
+            else:
+                yield path
+
+    start = time.perf_counter()
+    paths = todo()
+    while chunk := list(islice(paths, chunk_size)):
+        chunk_start = time.perf_counter()
+        handles, read_ms, lines = [], [], []
+        unreadable = {}
+        for path in chunk:
+            t = time.perf_counter()
+            try:
+                handles.append(ImageHandle(Path(path).read_bytes(), path))
+                read_ms.append((time.perf_counter() - t) * 1000)
+            except OSError as exc:
+                unreadable[path] = error_result(exc)
+
+        for idx, result in iter_predict(handles, batch_size=batch_size, use_cache=use_cache):
+            handle = handles[idx]
+            lines.append(_line(handle.name, handle.content_hash, result, read_ms[idx], chunk_start))
+            stats["errors"] += is_error(result)
+        for path, result in unreadable.items():
+            lines.append(_line(path, None, result, 0.0, chunk_start))
+            stats["errors"] += 1
+
+        out.write("".join(lines))
+        out.flush()
+        stats["scanned"] += len(lines)
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["images_per_second"] = stats["scanned"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def _line(path: str, h: str | None, result: dict, read_ms: float, chunk_start: float) -> str:
+    record = {
+        "path": path,
+        "hash": h,
+        "label": result["label"],
+        "confidence": result["confidence"],
+        "details": result["details"],
+        "timings": {
+            "read_ms": round(read_ms, 3),
+            "latency_ms": round((time.perf_counter() - chunk_start) * 1000, 3),
+        },
+    }
+    return json.dumps(record) + "\n"
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("targets", nargs="+", help="directories, globs or image files")
+    parser.add_argument("-o", "--output", help="JSONL output file, also used to resume (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="files read per chunk")
+    parser.add_argument("--batch-size", type=int, help="images per forward pass (default: from the memory budget)")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not fill the result cache/store")
+
+
+def run(args: argparse.Namespace) -> int:
+    metrics.start_file_writer()
+    if args.output:
+        output = Path(args.output)
+        try:
+            done = load_checkpoint(output)
+        except ValueError as exc:
+            print(f"Cannot resume from {output}: {exc}", file=sys.stderr)
+            return 2
+        out = open(output, "a", encoding="utf-8")
+    else:
+        done, out = set(), sys.stdout
+    try:
+        stats = scan(
+            args.targets,
+            out,
+            done=done,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            use_cache=not args.no_cache,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if metrics.METRICS_FILE:
+            metrics.write_file()
+    print(
+        f"Scanned {stats['scanned']} images ({stats['errors']} errors, "
+        f"{stats['skipped']} already done) in {stats['seconds']:.1f}s: "
+        f"{stats['images_per_second']:.2f} images/s",
+        file=sys.stderr,
+    )
+    return 0
@@ -0,0 +1,331 @@
+"""
+Local HTTP inference service: ``python -m inference serve``.
+
+    GET  /healthz   200 while the process is up
+    GET  /readyz    200 once the model is loaded and warmed up, else 503
+    GET  /metrics   Prometheus text format, when metrics are enabled
+                    (see `inference.metrics`)
+    POST /predict   one image as the raw request body, or several as
+                    multipart/form-data (one file per part)
+
+Concurrent requests are coalesced by `MicroBatcher`: images wait until
+`max_batch_size` are queued or the oldest has waited `max_wait_ms`, then
+run as one batch through `iter_predict` (cache, store and decode
+pipeline included). The queue holds at most `max_queue` images; a
+request that does not fit is rejected with 503 and ``Retry-After``
+instead of growing latency without bound, and one with more images than
+the whole queue holds with 413, since retrying cannot help. A request whose results are
+not ready within `REQUEST_TIMEOUT_S` gets 504, and any other failure
+500, both with a JSON ``{"error": ...}`` body; its images still queued
+are dropped instead of run.
+
+Responses carry the request latency, and every result its queue wait
+and the size of the batch it ran in:
+
+    {"results": [{"name": ..., "hash": ..., "label": ..., "confidence": ...,
+                  "details": {...}, "queue_ms": ..., "batch_size": ...}],
+     "latency_ms": ...}
+
+A single raw-body image returns the result object itself with
+``latency_ms`` added. Only the standard library is used for HTTP.
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.parser
+import email.policy
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from inference import metrics
+from inference.runtime import ModelLoader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_WAIT_MS = 10.0
+DEFAULT_MAX_QUEUE = 256
+MAX_REQUEST_BYTES = 256 * 1024 * 1024
+REQUEST_TIMEOUT_S = 300.0
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a request does not fit in the micro-batching queue."""
+
+
+class RequestTooLargeError(ValueError):
+    """Raised when a request has more images than the queue can ever hold."""
+
+
+class MicroBatcher:
+    """
+    Coalesces images from concurrent requests into model batches.
+
+    `submit` enqueues a request's images atomically (all or none) and
+    returns one Future per image; a single worker thread drains the queue.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max(max_queue, self.max_batch_size)
+        self._queue: deque[tuple[object, float, Future]] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> MicroBatcher:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, handles) -> list[Future]:
+        """
+        Queue `handles`. Raises `QueueFullError` if they do not fit now,
+        and `RequestTooLargeError` if they never will.
+        """
+        if len(handles) > self.max_queue:
+            raise RequestTooLargeError(
+                f"{len(handles)} images exceed the queue size of {self.max_queue}; "
+                "send them in smaller requests"
+            )
+        now = time.perf_counter()
+        futures = [Future() for _ in handles]
+        with self._cond:
+            if len(self._queue) + len(handles) > self.max_queue:
+                raise QueueFullError(
+                    f"{len(handles)} images do not fit: queue holds "
+                    f"{len(self._queue)}/{self.max_queue}"
+                )
+            self._queue.extend(zip(handles, [now] * len(handles), futures))
+            self._cond.notify()
+        return futures
+
+    def _next_batch(self) -> list[tuple[object, float, Future]]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0][1] + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            n = min(self.max_batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(n)]
+        # Skip images whose request has given up (its futures were cancelled).
+        return [item for item in batch if item[2].set_running_or_notify_cancel()]
+
+    def _run(self):
+        from inference.pipeline import error_result
+        from inference.predictor import iter_predict
+
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            handles = [handle for handle, _, _ in batch]
+            try:
+                for idx, result in iter_predict(handles, batch_size=len(batch)):
+                    _, queued_at, future = batch[idx]
+                    result["queue_ms"] = round((started - queued_at) * 1000, 3)
+                    result["batch_size"] = len(batch)
+                    future.set_result(result)
+            except Exception as exc:
+                logger.exception("Batch failed")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(error_result(exc))
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, loader: ModelLoader, batcher: MicroBatcher):
+        super().__init__(address, _Handler)
+        self.loader = loader
+        self.batcher = batcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: PredictionServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/readyz":
+            loader = self.server.loader
+            body = {"state": loader.state, "queue_depth": self.server.batcher.depth}
+            if loader.error is not None:
+                body["error"] = str(loader.error)
+            status = HTTPStatus.OK if loader.ready else HTTPStatus.SERVICE_UNAVAILABLE
+            self._send_json(status, body)
+        elif self.path == "/metrics" and metrics.METRICS_ENABLED:
+            data = metrics.render().encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"no route {self.path}"})
+
+    def do_POST(self):
+        self._start = time.perf_counter()
+        if self.path != "/predict":
+            # The body is left unread, so the connection cannot be reused.
+            self.close_connection = True
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"no route {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request too large"})
+            return
+        body = self.rfile.read(length)
+        if not self.server.loader.ready:
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": f"model {self.server.loader.state}"},
+                retry_after=1,
+            )
+            return
+
+        from inference.handle import ImageHandle
+
+        content_type = self.headers.get("Content-Type", "")
+        multipart = content_type.startswith("multipart/")
+        if multipart:
+            handles = [ImageHandle(data, name) for name, data in _parse_multipart(content_type, body)]
+        else:
+            handles = [ImageHandle(body, self.headers.get("X-Filename", "image"))] if body else []
+        if not handles:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "no image in request"})
+            return
+
+        try:
+            futures = self.server.batcher.submit(handles)
+        except QueueFullError as exc:
+            metrics.REQUESTS_REJECTED.inc()
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)}, retry_after=1)
+            return
+        except RequestTooLargeError as exc:
+            metrics.REQUESTS_REJECTED.inc()
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": str(exc)})
+            return
+        deadline = time.monotonic() + REQUEST_TIMEOUT_S
+        results = []
+        try:
+            for handle, future in zip(handles, futures):
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                results.append({"name": handle.name, "hash": handle.content_hash, **result})
+        except TimeoutError:
+            _cancel(futures)
+            self._send_json(
+                HTTPStatus.GATEWAY_TIMEOUT,
+                {"error": f"no result within {REQUEST_TIMEOUT_S:g}s"},
+            )
+            return
+        except Exception as exc:
+            logger.exception("Request failed")
+            _cancel(futures)
+            self._send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+            )
+            return
+
+        latency_ms = round((time.perf_counter() - self._start) * 1000, 3)
+        if multipart:
+            self._send_json(HTTPStatus.OK, {"results": results, "latency_ms": latency_ms})
+        else:
+            self._send_json(HTTPStatus.OK, {**results[0], "latency_ms": latency_ms})
+
+    def _send_json(self, status: HTTPStatus, body: dict, retry_after: int | None = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+        if self.command == "POST":
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - self._start, str(int(status)))
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def _cancel(futures: list[Future]):
+    """Drop a request's images that are still queued; running ones finish."""
+    for future in futures:
+        future.cancel()
+
+
+def _parse_multipart(content_type: str, body: bytes) -> list[tuple[str, bytes]]:
+    """(filename, bytes) for every non-empty part of a multipart body."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    parts = []
+    for i, part in enumerate(message.iter_parts()):
+        data = part.get_payload(decode=True)
+        if data:
+            parts.append((part.get_filename() or f"image-{i}", data))
+    return parts
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+) -> PredictionServer:
+    """Start loading the model and return a server ready for `serve_forever`."""
+    batcher = MicroBatcher(max_batch_size, max_wait_ms, max_queue).start()
+    metrics.QUEUE_DEPTH.set_function(lambda: batcher.depth)
+    return PredictionServer((host, port), ModelLoader().start(), batcher)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="longest an image waits for a batch to fill")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="queued images above which requests get 503")
+
+
+def run(args: argparse.Namespace) -> int:
+    server = serve(args.host, args.port, args.max_batch_size, args.max_wait_ms, args.max_queue)
+    logger.info("Serving on http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
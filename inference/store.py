@@ -0,0 +1,134 @@
+"""
+Persistent SQLite result store shared across sessions and restarts.
+
+Rows are keyed by (content hash, model fingerprint), so results survive
+server restarts but are never reused across different checkpoints or
+result-affecting settings.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+# Rows written between two TTL / size-cap passes.
+_PRUNE_EVERY = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    content_hash TEXT NOT NULL,
+    model        TEXT NOT NULL,
+    label        TEXT NOT NULL,
+    confidence   REAL NOT NULL,
+    details      TEXT NOT NULL,
+    created_at   REAL NOT NULL,
+    PRIMARY KEY (content_hash, model)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at);
+"""
+
+
+class ResultStore:
+    """
+    SQLite-backed result store with a TTL and a row cap.
+
+    Each thread gets its own connection. The database runs in WAL mode so
+    readers in other sessions or processes are not blocked by writers.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float | None = 30 * 24 * 3600,
+        max_entries: int | None = 1_000_000,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes_since_prune = 0
+        self._prune_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _min_created_at(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> dict[str, dict]:
+        """Look up a whole batch of content hashes in one query."""
+        rows = self._conn().execute(
+            """
+            SELECT content_hash, label, confidence, details FROM results
+            WHERE model = ?
+              AND content_hash IN (SELECT value FROM json_each(?))
+              AND created_at >= ?
+            """,
+            (model, json.dumps(list(hashes)), self._min_created_at()),
+        )
+        return {
+            h: {"label": label, "confidence": conf, "details": json.loads(details)}
+            for h, label, conf, details in rows
+        }
+
+    def put_many(self, model: str, items: Iterable[tuple[str, dict]]):
+        """Insert or replace (content hash, result) pairs."""
+        now = time.time()
+        rows = [
+            (
+                h,
+                model,
+                r["label"],
+                float(r["confidence"]),
+                json.dumps(r.get("details", {}), default=str),
+                now,
+            )
+            for h, r in items
+        ]
+        conn = self._conn()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+        # TTL and row-cap enforcement scan the index, so amortize it.
+        with self._prune_lock:
+            self._writes_since_prune += len(rows)
+            due = self._writes_since_prune >= _PRUNE_EVERY
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Delete expired rows and the oldest rows beyond `max_entries`."""
+        conn = self._conn()
+        with conn:
+            self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection):
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM results WHERE created_at < ?", (self._min_created_at(),))
+        if self.max_entries:
+            conn.execute(
+                """
+                DELETE FROM results WHERE (content_hash, model) IN (
+                    SELECT content_hash, model FROM results
+                    ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM results").fetchone()[0]
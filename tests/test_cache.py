@@ -0,0 +1,55 @@
+from inference.cache import ResultCache, content_hash
+from inference.predictor import _cache_key
+
+
+def result(label="real", **details):
+    return {"label": label, "confidence": 0.9, "details": details}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", result())
+    cache.put("b", result())
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.put("c", result())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_size_bound_evicts_oldest_entries():
+    entry = result(note="x" * 1000)
+    size = len("a") + len(repr(entry))
+    cache = ResultCache(max_entries=100, max_bytes=2 * size)
+    for key in "abc":
+        cache.put(key, entry)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] <= 2 * size
+
+
+def test_replacing_an_entry_does_not_leak_its_size():
+    cache = ResultCache()
+    cache.put("a", result(note="x" * 1000))
+    cache.put("a", result())
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] == len("a") + len(repr(result()))
+
+
+def test_returned_results_are_copies():
+    cache = ResultCache()
+    cache.put("a", result(timings_ms={"model": 1.0}))
+    got = cache.get("a")
+    got["details"]["cache_hit"] = True
+    got["details"]["timings_ms"]["model"] = 2.0
+    assert cache.get("a") == result(timings_ms={"model": 1.0})
+
+
+def test_keys_follow_content_and_fingerprint():
+    data = b"same image bytes"
+    cache = ResultCache()
+    cache.put(_cache_key("model-a", content_hash(data)), result("spoof"))
+    # Same bytes under another file name hit; another fingerprint or other bytes miss.
+    assert cache.get(_cache_key("model-a", content_hash(bytes(data))))["label"] == "spoof"
+    assert cache.get(_cache_key("model-b", content_hash(data))) is None
+    assert cache.get(_cache_key("model-a", content_hash(data + b"!"))) is None
+    assert (cache.hits, cache.misses) == (1, 2)
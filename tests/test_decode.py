@@ -0,0 +1,45 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from inference.bench import synthetic_image
+from inference.decode import DECODERS, _reference_rgb_224, decode_image, decode_rgb_224
+
+# Largest per-pixel difference allowed against a full-resolution decode
+# and resize, and the mean difference, in uint8 levels. JPEG draft mode
+# decodes with DCT scaling, so it differs slightly; lossless and cv2
+# decodes should produce the same pixels.
+TOLERANCES = {"JPEG": (8, 1.0), "PNG": (0, 0.0), "WEBP": (1, 0.1)}
+
+
+@pytest.mark.parametrize(
+    "fmt, size",
+    [
+        ("JPEG", (1600, 1200)),
+        ("JPEG", (4000, 3000)),
+        ("PNG", (1600, 1200)),
+        ("WEBP", (1600, 1200)),
+    ],
+)
+def test_fast_decode_matches_full_decode(fmt, size):
+    data = synthetic_image(size, fmt, seed=1)
+    diff = np.abs(decode_rgb_224(data).astype(np.int16) - _reference_rgb_224(data))
+    max_diff, mean_diff = TOLERANCES[fmt]
+    assert diff.max() <= max_diff
+    assert diff.mean() <= mean_diff
+
+
+def test_jpeg_draft_decodes_at_reduced_resolution():
+    data = synthetic_image((4000, 3000), "JPEG")
+    img = decode_image(data)
+    assert img.size[0] < 4000 and min(img.size) >= 448
+
+
+@pytest.mark.parametrize("fmt", ["PNG", "WEBP"])
+def test_configured_decoder_is_used(fmt):
+    # The cv2 path returns a plain image; PIL's keeps its format.
+    img = decode_image(synthetic_image((640, 480), fmt))
+    assert (img.format is None) == (DECODERS.get(fmt) == "cv2")
+    assert img.size == Image.open(BytesIO(synthetic_image((640, 480), fmt))).size
@@ -0,0 +1,75 @@
+import importlib
+
+import pytest
+
+from ui import grid
+
+
+@pytest.fixture
+def reload_grid(monkeypatch):
+    def reload(page_size):
+        monkeypatch.setenv("SPOOF_UI_PAGE_SIZE", page_size)
+        return importlib.reload(grid)
+
+    yield reload
+    monkeypatch.delenv("SPOOF_UI_PAGE_SIZE")
+    importlib.reload(grid)
+
+
+@pytest.mark.parametrize("value, expected", [("0", 1), ("-5", 1), ("1", 1), ("30", 30)])
+def test_default_page_size_is_clamped(reload_grid, value, expected):
+    module = reload_grid(value)
+    assert module.DEFAULT_PAGE_SIZE == expected
+    assert expected in module.page_size_options()
+    assert module.page_size_options() == sorted(module.page_size_options())
+
+
+def test_empty_list_has_one_empty_page():
+    assert grid.page_count(0, 12) == 1
+    assert grid.page_slice([], 1, 12) == []
+    assert list(grid.rows([])) == []
+
+
+def test_last_page_is_partial():
+    items = list(range(25))
+    assert grid.page_count(len(items), 12) == 3
+    assert grid.page_slice(items, 2, 12) == list(range(12, 24))
+    assert grid.page_slice(items, 3, 12) == [24]
+    assert grid.page_count(24, 12) == 2
+
+
+def test_rows_split_a_page_into_columns():
+    assert [list(r) for r in grid.rows(list(range(6)), cols=4)] == [[0, 1, 2, 3], [4, 5]]
+
+
+RESULTS = {
+    "a.png": {"label": "real", "confidence": 0.95},
+    "b.png": {"label": "spoof", "confidence": 0.55},
+    "c.png": {"label": "error", "confidence": 0.0},
+    "d.png": {"label": "real", "confidence": 0.65},
+}
+
+
+@pytest.mark.parametrize(
+    "view, expected",
+    [
+        ("All", ["a.png", "b.png", "c.png", "d.png"]),
+        ("Real", ["a.png", "d.png"]),
+        ("Spoof", ["b.png"]),
+        ("Failed", ["c.png"]),
+        ("Low confidence", ["b.png", "d.png"]),
+    ],
+)
+def test_select_results_filters(view, expected):
+    assert grid.select_results(RESULTS, view, low_confidence=0.7) == expected
+
+
+def test_select_results_orders_by_confidence():
+    assert grid.select_results(RESULTS, order="Confidence: low to high") == [
+        "c.png", "b.png", "d.png", "a.png"
+    ]
+    assert grid.select_results(RESULTS, "Real", "Confidence: high to low") == ["a.png", "d.png"]
+
+
+def test_select_results_on_no_results():
+    assert grid.select_results({}, "Spoof", "Confidence: high to low") == []
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from inference.bench import synthetic_image
+from inference.decode import decode_rgb_224
+from inference.handle import ImageHandle
+from inference.pipeline import is_error, pipelined_batches
+
+
+def fingerprint_infer(batch):
+    # One result per array, identifying which image it came from.
+    return [
+        {"label": "real", "confidence": float(rgb.mean()), "details": {}} for rgb in batch
+    ]
+
+
+@pytest.fixture
+def handles():
+    items = []
+    for i in range(9):
+        if i in (2, 5, 6):
+            items.append(ImageHandle(b"not an image %d" % i, f"bad-{i}.png"))
+        else:
+            items.append(ImageHandle(synthetic_image((320, 240), "PNG", seed=i), f"{i}.png"))
+    return items
+
+
+@pytest.mark.parametrize("batch_size, workers", [(1, 1), (2, 3), (4, 2), (16, 4)])
+def test_results_follow_input_order_with_errors_in_place(handles, batch_size, workers):
+    batches = list(pipelined_batches(handles, fingerprint_infer, batch_size, workers))
+    pairs = [pair for batch in batches for pair in batch]
+
+    assert [idx for idx, _ in pairs] == list(range(len(handles)))
+    for (idx, result), handle in zip(pairs, handles):
+        if handle.name.startswith("bad"):
+            assert is_error(result) and result["details"]["error"]
+        else:
+            expected = float(decode_rgb_224(handle.getvalue()).mean())
+            assert result["confidence"] == pytest.approx(expected)
+            assert "decode" in result["details"]["timings_ms"]
+    assert all(
+        sum(not is_error(result) for _, result in batch) <= batch_size for batch in batches
+    )
+
+
+def test_failed_batch_only_fails_its_own_images(handles):
+    calls = 0
+
+    def flaky_infer(batch):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("boom")
+        return fingerprint_infer(batch)
+
+    pairs = [pair for batch in pipelined_batches(handles, flaky_infer, 2, 1) for pair in batch]
+    failed = [idx for idx, r in pairs if is_error(r) and "boom" in r["details"]["error"]]
+    ok = [idx for idx, r in pairs if not is_error(r)]
+    assert len(failed) == 2
+    assert ok and not set(ok) & set(failed)
+
+
+def test_decoded_arrays_are_released(handles):
+    for _ in pipelined_batches(handles, fingerprint_infer, 3, 2):
+        pass
+    assert all(handle._rgb_224 is None for handle in handles)
+
+
+def test_thumbnail_does_not_keep_the_model_input():
+    handle = ImageHandle(synthetic_image((320, 240), "PNG", seed=0), "a.png", with_thumbnail=True)
+    assert handle.thumbnail()[1] == "image/jpeg"
+    assert handle._rgb_224 is None
+    assert handle.rgb_224().shape == (224, 224, 3)
+
+
+def test_empty_input():
+    assert list(pipelined_batches([], fingerprint_infer, 4, 2)) == []
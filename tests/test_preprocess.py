@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from inference.preprocess import fft_highpass_batch
+
+# Documented agreement with the original float64 per-image FFT after
+# normalization (see `fft_highpass_batch`).
+TOLERANCE = 1e-3
+
+
+def reference_highpass(img_rgb, r=8, eps=1e-8):
+    """The original per-image implementation: float64 complex FFT, fftshift-ed mask."""
+    import cv2
+
+    gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY).astype(np.float32)
+    Xs = np.fft.fftshift(np.fft.fft2(gray))
+    h, w = gray.shape
+    Y, Xc = np.ogrid[:h, :w]
+    mask = ((Y - h // 2) ** 2 + (Xc - w // 2) ** 2 >= r * r).astype(np.float32)
+    xhp = np.fft.ifft2(np.fft.ifftshift(Xs * mask))
+    hplog = np.log1p(np.abs(xhp))
+    return (hplog - hplog.min()) / (hplog.max() - hplog.min() + eps)
+
+
+@pytest.fixture(scope="module")
+def images():
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, size=(4, 224, 224, 3), dtype=np.uint8)
+    y, x = np.mgrid[0:224, 0:224]
+    gradient = np.stack([x, y, (x + y) // 2], axis=-1).astype(np.uint8)[None]
+    return np.concatenate([noise, gradient])
+
+
+def test_batch_matches_per_image_baseline(images):
+    batch = fft_highpass_batch(images)
+    for img, out in zip(images, batch):
+        np.testing.assert_allclose(out, reference_highpass(img), atol=TOLERANCE, rtol=0)
+
+
+def test_lowpass_engine_matches_fft_engine(images):
+    fft = fft_highpass_batch(images, engine="fft")
+    lowpass = fft_highpass_batch(images, engine="lowpass")
+    np.testing.assert_allclose(lowpass, fft, atol=TOLERANCE, rtol=0)
+
+
+@pytest.mark.parametrize("engine", ["fft", "lowpass"])
+def test_engines_match_float64_reference(images, engine):
+    batch = fft_highpass_batch(images, engine=engine)
+    reference = np.stack([reference_highpass(img) for img in images])
+    np.testing.assert_allclose(batch, reference, atol=TOLERANCE, rtol=0)
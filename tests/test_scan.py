@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from inference.scan import load_checkpoint
+
+
+def line(path, label="real"):
+    return json.dumps({"path": path, "label": label, "confidence": 0.9, "details": {}}) + "\n"
+
+
+def test_missing_output_resumes_from_nothing(tmp_path):
+    assert load_checkpoint(tmp_path / "out.jsonl") == set()
+
+
+def test_torn_last_line_is_truncated(tmp_path):
+    output = tmp_path / "out.jsonl"
+    complete = line("a.png") + line("b.png")
+    output.write_text(complete + line("c.png")[:20])
+    assert load_checkpoint(output) == {"a.png", "b.png"}
+    assert output.read_text() == complete
+
+
+def test_corrupt_middle_line_raises_and_keeps_the_file(tmp_path):
+    output = tmp_path / "out.jsonl"
+    text = line("a.png") + "{not json\n" + line("b.png")
+    output.write_text(text)
+    with pytest.raises(ValueError, match=":2:"):
+        load_checkpoint(output)
+    assert output.read_text() == text
+
+
+@pytest.mark.parametrize("text", ["name,label\na.png,real\n", "some notes", '["a.png"]\n'])
+def test_non_jsonl_file_is_refused(tmp_path, text):
+    output = tmp_path / "out.csv"
+    output.write_text(text)
+    with pytest.raises(ValueError):
+        load_checkpoint(output)
+    assert output.read_text() == text
+
+
+def test_failed_files_are_retried(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(line("a.png") + line("b.png", "error") + line("c.png", "spoof"))
+    assert load_checkpoint(output) == {"a.png", "c.png"}
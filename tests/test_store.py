@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from inference.store import ResultStore
+
+
+def result(label="real", confidence=0.9, **details):
+    return {"label": label, "confidence": confidence, "details": details}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(tmp_path / "results.sqlite", ttl_seconds=None, max_entries=None)
+
+
+def test_bulk_lookup_returns_only_stored_hashes(store):
+    store.put_many("m", [("a", result()), ("b", result("spoof", 0.6, timings_ms={"model": 1.5}))])
+    found = store.get_many("m", ["a", "b", "missing"])
+    assert found.keys() == {"a", "b"}
+    assert found["b"] == result("spoof", 0.6, timings_ms={"model": 1.5})
+    assert store.get_many("m", []) == {}
+
+
+def test_fingerprints_are_isolated(store):
+    store.put_many("m1", [("a", result("real"))])
+    store.put_many("m2", [("a", result("spoof"))])
+    assert store.get_many("m1", ["a"])["a"]["label"] == "real"
+    assert store.get_many("m2", ["a"])["a"]["label"] == "spoof"
+    assert store.get_many("m3", ["a"]) == {}
+
+
+def test_put_replaces_existing_row(store):
+    store.put_many("m", [("a", result("real"))])
+    store.put_many("m", [("a", result("spoof"))])
+    assert len(store) == 1
+    assert store.get_many("m", ["a"])["a"]["label"] == "spoof"
+
+
+def test_expired_rows_are_hidden_and_pruned(tmp_path, monkeypatch):
+    store = ResultStore(tmp_path / "results.sqlite", ttl_seconds=60, max_entries=None)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now - 120)
+    store.put_many("m", [("old", result())])
+    monkeypatch.setattr(time, "time", lambda: now)
+    store.put_many("m", [("new", result())])
+
+    assert store.get_many("m", ["old", "new"]).keys() == {"new"}
+    assert len(store) == 2
+    store.prune()
+    assert len(store) == 1
+
+
+def test_prune_keeps_the_newest_rows_up_to_the_cap(tmp_path, monkeypatch):
+    store = ResultStore(tmp_path / "results.sqlite", ttl_seconds=None, max_entries=2)
+    for i, h in enumerate(["a", "b", "c"]):
+        monkeypatch.setattr(time, "time", lambda i=i: 1000.0 + i)
+        store.put_many("m", [(h, result())])
+    store.prune()
+    assert store.get_many("m", ["a", "b", "c"]).keys() == {"b", "c"}
+
+
+def test_rows_survive_reopening(tmp_path):
+    ResultStore(tmp_path / "results.sqlite").put_many("m", [("a", result())])
+    assert ResultStore(tmp_path / "results.sqlite").get_many("m", ["a"]) == {"a": result()}
+
+
+def test_writes_trigger_a_prune(tmp_path, monkeypatch):
+    monkeypatch.setattr("inference.store._PRUNE_EVERY", 3)
+    store = ResultStore(tmp_path / "results.sqlite", ttl_seconds=None, max_entries=2)
+    store.put_many("m", [("a", result()), ("b", result())])
+    assert len(store) == 2
+    store.put_many("m", [("c", result())])
+    assert len(store) == 2
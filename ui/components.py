@@ -4,6 +4,8 @@ Reusable HTML components for rendering UI elements.
 
 from __future__ import annotations
 
+from html import escape
+
 
 def hero_section() -> str:
     """Render the hero / header section."""
@@ -45,8 +47,16 @@ def section_header(icon: str, title: str, count: int | None = None) -> str:
     """
 
 
-def stats_bar(total: int, real_count: int, spoof_count: int) -> str:
+def stats_bar(total: int, real_count: int, spoof_count: int, error_count: int = 0) -> str:
     """Render the summary statistics bar."""
+    error_html = (
+        f"""
+        <div class="stat-chip error-chip">
+            ❌ Failed <span class="stat-value">{error_count}</span>
+        </div>"""
+        if error_count
+        else ""
+    )
     return f"""
     <div class="stats-bar">
         <div class="stat-chip">
@@ -57,7 +67,7 @@ def stats_bar(total: int, real_count: int, spoof_count: int) -> str:
         </div>
         <div class="stat-chip spoof-chip">
             ⚠️ Spoof <span class="stat-value">{spoof_count}</span>
-        </div>
+        </div>{error_html}
     </div>
     """
 
@@ -68,6 +78,7 @@ def result_card(
     label: str,
     confidence: float,
     mime_type: str = "image/png",
+    caption: str | None = None,
 ) -> str:
     """
     Render a single result card with image, label, and confidence bar.
@@ -75,13 +86,16 @@ def result_card(
     Args:
         image_b64: Base64-encoded image string.
         filename: Original filename.
-        label: 'real' or 'spoof'.
+        label: 'real', 'spoof', or 'error' for files that failed.
         confidence: Confidence score between 0.0 and 1.0.
         mime_type: MIME type of the image.
+        caption: Optional line of plain text under the confidence bar.
     """
     label_lower = label.lower()
-    label_display = "AUTHENTIC" if label_lower == "real" else "SPOOFED"
-    icon = "✅" if label_lower == "real" else "⚠️"
+    label_display, icon = {
+        "real": ("AUTHENTIC", "✅"),
+        "error": ("FAILED", "❌"),
+    }.get(label_lower, ("SPOOFED", "⚠️"))
     pct = int(confidence * 100)
 
     return f"""
@@ -95,24 +109,44 @@ def result_card(
             <div class="result-filename" title="{filename}">{filename}</div>
             <div class="confidence-bar-bg">
                 <div class="confidence-bar-fill {label_lower}" style="width:{pct}%;"></div>
-            </div>
+            </div>{_caption_html(caption)}
         </div>
     </div>
     """
 
 
-def image_preview_card(image_b64: str, filename: str, mime_type: str = "image/png") -> str:
+def image_preview_card(
+    image_b64: str, filename: str, mime_type: str = "image/png", caption: str | None = None
+) -> str:
     """Render a preview card for an uploaded (but not yet analyzed) image."""
     return f"""
     <div class="image-card fade-in-up">
         <img src="data:{mime_type};base64,{image_b64}" alt="{filename}" />
         <div class="image-card-body">
-            <div class="image-card-name" title="{filename}">{filename}</div>
+            <div class="image-card-name" title="{filename}">{filename}</div>{_caption_html(caption)}
         </div>
     </div>
     """
 
 
+def _caption_html(caption: str | None) -> str:
+    """Caption line; the full text stays in the tooltip when it is truncated."""
+    if not caption:
+        return ""
+    caption = escape(caption)
+    return f'<div class="card-caption" title="{caption}">{caption}</div>'
+
+
+def card_row(cards: list[str]) -> str:
+    """
+    Lay out one grid row of cards as a single HTML block.
+
+    Cards are stripped of surrounding whitespace so the row stays one
+    Markdown HTML block.
+    """
+    return f'<div class="card-row">{"".join(card.strip() for card in cards)}</div>'
+
+
 def footer() -> str:
     """Render the app footer."""
     return """
@@ -0,0 +1,73 @@
+"""
+Paging, filtering and sorting for the preview and result grids.
+
+Everything here works on file lists and the compact results dict
+(``{filename: result}``) without touching image data, so the page only
+builds thumbnails and cards for the visible slice.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from typing import Iterator, Sequence, TypeVar
+
+T = TypeVar("T")
+
+COLS_PER_ROW = 4
+PAGE_SIZES = (12, 24, 48, 96)
+# Cards per page until the user picks another size.
+DEFAULT_PAGE_SIZE = max(1, int(os.environ.get("SPOOF_UI_PAGE_SIZE", "24")))
+# Results below this confidence match the "Low confidence" filter.
+LOW_CONFIDENCE = float(os.environ.get("SPOOF_UI_LOW_CONFIDENCE", "0.7"))
+
+RESULT_FILTERS = ("All", "Real", "Spoof", "Low confidence", "Failed")
+RESULT_ORDERS = ("Upload order", "Confidence: low to high", "Confidence: high to low")
+
+_FILTER_LABELS = {"Real": "real", "Spoof": "spoof", "Failed": "error"}
+
+
+def page_size_options() -> list[int]:
+    """`PAGE_SIZES` plus `DEFAULT_PAGE_SIZE`, ascending."""
+    return sorted(set(PAGE_SIZES) | {DEFAULT_PAGE_SIZE})
+
+
+def page_count(n_items: int, page_size: int) -> int:
+    return max(1, math.ceil(n_items / page_size))
+
+
+def page_slice(items: Sequence[T], page: int, page_size: int) -> Sequence[T]:
+    """Items on 1-based `page`."""
+    start = (page - 1) * page_size
+    return items[start : start + page_size]
+
+
+def rows(items: Sequence[T], cols: int = COLS_PER_ROW) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), cols):
+        yield items[start : start + cols]
+
+
+def select_results(
+    results: dict[str, dict],
+    view: str = "All",
+    order: str = "Upload order",
+    low_confidence: float = LOW_CONFIDENCE,
+) -> list[str]:
+    """
+    Filenames in `results` matching filter `view` (one of `RESULT_FILTERS`),
+    sorted by `order` (one of `RESULT_ORDERS`).
+    """
+    names = [name for name, r in results.items() if _matches(r, view, low_confidence)]
+    if order != RESULT_ORDERS[0]:
+        names.sort(
+            key=lambda name: results[name]["confidence"],
+            reverse=order == "Confidence: high to low",
+        )
+    return names
+
+
+def _matches(result: dict, view: str, low_confidence: float) -> bool:
+    if view == "Low confidence":
+        return result["label"] != "error" and result["confidence"] < low_confidence
+    label = _FILTER_LABELS.get(view)
+    return label is None or result["label"] == label
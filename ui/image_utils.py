@@ -10,6 +10,8 @@ from typing import TYPE_CHECKING
 
 from PIL import Image
 
+from inference.handle import ImageHandle, get_mime_type
+
 if TYPE_CHECKING:
     from streamlit.runtime.uploaded_file_manager import UploadedFile
 
@@ -18,33 +20,20 @@ if TYPE_CHECKING:
 ALLOWED_TYPES = ["png", "jpg", "jpeg", "webp"]
 
 
-def file_to_base64(uploaded_file: UploadedFile) -> str:
-    """Convert a Streamlit UploadedFile to a base64-encoded string."""
+def file_to_base64(uploaded_file: UploadedFile | ImageHandle) -> str:
+    """Convert a Streamlit UploadedFile or ImageHandle to a base64-encoded string."""
     data = uploaded_file.getvalue()
     return base64.b64encode(data).decode("utf-8")
 
 
-def get_mime_type(uploaded_file: UploadedFile) -> str:
-    """Return the MIME type string for an uploaded file."""
-    name = uploaded_file.name.lower()
-    if name.endswith(".png"):
-        return "image/png"
-    if name.endswith((".jpg", ".jpeg")):
-        return "image/jpeg"
-    if name.endswith(".webp"):
-        return "image/webp"
-    return "image/png"
-
-
-def open_image(uploaded_file: UploadedFile) -> Image.Image:
-    """Open a Streamlit uploaded file as a PIL Image."""
+def open_image(uploaded_file: UploadedFile | ImageHandle) -> Image.Image:
+    """Open a Streamlit uploaded file as a full-resolution PIL Image."""
     return Image.open(BytesIO(uploaded_file.getvalue())).convert("RGB")
 
 
-def get_image_dimensions(uploaded_file: UploadedFile) -> tuple[int, int]:
-    """Return (width, height) of the uploaded image."""
-    img = open_image(uploaded_file)
-    return img.size
+def get_image_dimensions(uploaded_file: UploadedFile | ImageHandle) -> tuple[int, int]:
+    """Return (width, height) of the uploaded image without decoding pixels."""
+    return ImageHandle.from_upload(uploaded_file).dimensions
 
 
 def format_file_size(size_bytes: int) -> str:
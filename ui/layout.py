@@ -4,6 +4,8 @@ Main page layout and rendering logic.
 
 from __future__ import annotations
 
+import os
+
 import streamlit as st
 
 from ui.styles import get_custom_css
@@ -14,16 +16,30 @@ from ui.components import (
     stats_bar,
     result_card,
     image_preview_card,
+    card_row,
     footer,
 )
+from ui.grid import (
+    DEFAULT_PAGE_SIZE,
+    RESULT_FILTERS,
+    RESULT_ORDERS,
+    page_count,
+    page_size_options,
+    page_slice,
+    rows,
+    select_results,
+)
 from ui.image_utils import (
     ALLOWED_TYPES,
-    file_to_base64,
-    get_mime_type,
+    ImageHandle,
     format_file_size,
 )
+from ui.thumbnails import thumbnail_base64
 from ui.state import reset_results, set_processing, add_result
-from inference import predict
+from ui.model_loader import get_model_loader, get_predict_batch
+
+# Show the admin sidebar (profiler controls).
+ADMIN_UI = os.environ.get("SPOOF_ADMIN_UI", "") == "1"
 
 
 # ── Rendering Functions ──────────────────────────────────────────────
@@ -31,7 +47,10 @@ from inference import predict
 
 def render_page():
     """Render the full page layout."""
+    get_model_loader()  # kick off the background model load
     _inject_styles()
+    if ADMIN_UI:
+        _render_admin_panel()
     _render_hero()
     _render_uploader()
     _render_preview_and_controls()
@@ -44,6 +63,39 @@ def _inject_styles():
     st.markdown(get_custom_css(), unsafe_allow_html=True)
 
 
+def _render_admin_panel():
+    """Sidebar controls for this process's batch profiler."""
+    from inference.client import REMOTE_URL
+    from inference.profiling import batch_profiler
+
+    with st.sidebar:
+        st.markdown("### 🛠️ Admin")
+        if REMOTE_URL:
+            st.caption("Inference runs in the remote service; set SPOOF_PROFILE=1 there.")
+            return
+        batch_profiler.enabled = st.toggle(
+            "Profile batches", value=batch_profiler.enabled, key="admin_profile"
+        )
+        batch_profiler.threshold_ms = st.number_input(
+            "Keep batches slower than (ms, 0 = off)",
+            min_value=0.0,
+            value=batch_profiler.threshold_ms,
+            step=100.0,
+            key="admin_profile_threshold",
+        )
+        batch_profiler.sample_rate = st.slider(
+            "Sample rate", 0.0, 1.0, value=batch_profiler.sample_rate, step=0.01,
+            key="admin_profile_rate",
+        )
+        st.caption(
+            f"Traces: `{batch_profiler.directory}`. Applies to this process only; "
+            "worker processes (SPOOF_PROCESS_WORKERS) follow SPOOF_PROFILE."
+        )
+        for summary in batch_profiler.recent():
+            with st.expander(summary.name.removesuffix(".summary.txt")):
+                st.code(summary.read_text(), language=None)
+
+
 def _render_hero():
     """Render the hero / header section."""
     st.markdown(hero_section(), unsafe_allow_html=True)
@@ -62,12 +114,23 @@ def _render_uploader():
     )
 
     if uploaded_files:
-        st.session_state.uploaded_files = uploaded_files
+        st.session_state.uploaded_files = _to_handles(uploaded_files)
     else:
         st.session_state.uploaded_files = []
         reset_results()
 
 
+def _to_handles(uploaded_files):
+    """Reuse ImageHandles across reruns so each upload is read and decoded once."""
+    previous = {
+        h.file_id: h for h in st.session_state.uploaded_files if h.file_id is not None
+    }
+    return [
+        previous.get(f.file_id) or ImageHandle.from_upload(f, with_thumbnail=True)
+        for f in uploaded_files
+    ]
+
+
 def _render_preview_and_controls():
     """Render image previews and the analyze button."""
     files = st.session_state.uploaded_files
@@ -81,55 +144,66 @@ def _render_preview_and_controls():
         unsafe_allow_html=True,
     )
 
-    cols_per_row = 4
-    for row_start in range(0, len(files), cols_per_row):
-        row_files = files[row_start : row_start + cols_per_row]
-        cols = st.columns(cols_per_row)
-
-        for col, f in zip(cols, row_files):
-            with col:
-                b64 = file_to_base64(f)
-                mime = get_mime_type(f)
-                st.markdown(
-                    image_preview_card(b64, f.name, mime),
-                    unsafe_allow_html=True,
-                )
-                size_str = format_file_size(f.size)
-                st.caption(f"📎 {size_str}")
+    for row in rows(_paginate(files, "preview")):
+        cards = []
+        for f in row:
+            b64, mime = thumbnail_base64(f)
+            caption = f"📎 {format_file_size(f.size)}"
+            cards.append(image_preview_card(b64, f.name, mime, caption=caption))
+        st.markdown(card_row(cards), unsafe_allow_html=True)
 
     # ── Analyze Button ───────────────────────────────────────
     st.markdown("<div style='height: 0.5rem;'></div>", unsafe_allow_html=True)
 
+    loader = get_model_loader()
+
     col_l, col_btn, col_r = st.columns([1, 2, 1])
     with col_btn:
         analyze_clicked = st.button(
             f"🔍  Analyze {len(files)} Image{'s' if len(files) > 1 else ''}",
             use_container_width=True,
             type="primary",
+            disabled=not loader.ready,
         )
+        if loader.state == "error":
+            st.error(f"Model failed to load: {loader.error}")
+        elif not loader.ready:
+            _poll_model_status()
 
     if analyze_clicked:
         _run_analysis(files)
 
 
+@st.fragment(run_every=1.0)
+def _poll_model_status():
+    """Show a loading hint and rerun the page once the model is ready."""
+    loader = get_model_loader()
+    if loader.state in ("ready", "error"):
+        st.rerun()
+    st.caption("⏳ Loading model…")
+
+
 def _run_analysis(files):
-    """Execute inference on all uploaded files with a progress bar."""
+    """Execute batched inference on all uploaded files with a progress bar."""
+    predict_batch = get_predict_batch()
+
     reset_results()
     set_processing(True)
 
     progress_bar = st.progress(0, text="Initializing analysis…")
     total = len(files)
 
-    for idx, f in enumerate(files):
+    def on_batch_done(done: int, total: int):
         progress_bar.progress(
-            (idx) / total,
-            text=f"Analyzing {f.name} ({idx + 1}/{total})…",
+            done / total,
+            text=f"Analyzed {done}/{total} images…",
         )
 
-        result = predict(f)
+    results = predict_batch(files, progress_callback=on_batch_done)
+    for f, result in zip(files, results):
         add_result(f.name, result)
 
-    progress_bar.progress(1.0, text="✅ Analysis complete!")
+    progress_bar.progress(1.0, text=f"✅ Analysis complete! ({total} images)")
     set_processing(False)
     st.session_state.show_results = True
 
@@ -147,44 +221,95 @@ def _render_results():
 
     # ── Summary Stats ────────────────────────────────────────
     real_count = sum(1 for r in results.values() if r["label"].lower() == "real")
-    spoof_count = len(results) - real_count
+    error_count = sum(1 for r in results.values() if r["label"].lower() == "error")
+    spoof_count = len(results) - real_count - error_count
 
     st.markdown(
         section_header("📊", "Analysis Results", len(results)),
         unsafe_allow_html=True,
     )
     st.markdown(
-        stats_bar(len(results), real_count, spoof_count),
+        stats_bar(len(results), real_count, spoof_count, error_count),
         unsafe_allow_html=True,
     )
 
+    # ── Filters ──────────────────────────────────────────────
+    col_view, col_order = st.columns(2)
+    with col_view:
+        view = st.selectbox("Show", RESULT_FILTERS, key="results_view")
+    with col_order:
+        order = st.selectbox("Sort by", RESULT_ORDERS, key="results_order")
+
+    names = select_results(results, view, order)
+    if not names:
+        st.caption("No results match this filter.")
+        return
+
     # ── Result Cards Grid ────────────────────────────────────
-    cols_per_row = 4
     file_map = {f.name: f for f in files}
-
-    result_items = list(results.items())
-    for row_start in range(0, len(result_items), cols_per_row):
-        row = result_items[row_start : row_start + cols_per_row]
-        cols = st.columns(cols_per_row)
-
-        for col, (filename, result) in zip(cols, row):
-            with col:
-                f = file_map.get(filename)
-                if f is None:
-                    continue
-
-                b64 = file_to_base64(f)
-                mime = get_mime_type(f)
-                st.markdown(
-                    result_card(
-                        image_b64=b64,
-                        filename=filename,
-                        label=result["label"],
-                        confidence=result["confidence"],
-                        mime_type=mime,
-                    ),
-                    unsafe_allow_html=True,
+    for row in rows(_paginate(names, "results")):
+        cards = []
+        for filename in row:
+            f = file_map.get(filename)
+            if f is None:
+                continue
+
+            result = results[filename]
+            b64, mime = thumbnail_base64(f)
+            cards.append(
+                result_card(
+                    image_b64=b64,
+                    filename=filename,
+                    label=result["label"],
+                    confidence=result["confidence"],
+                    mime_type=mime,
+                    caption=_result_caption(result),
                 )
+            )
+        st.markdown(card_row(cards), unsafe_allow_html=True)
+
+
+def _paginate(items: list, key: str) -> list:
+    """Render page-size and page pickers for `items`; return the visible page."""
+    sizes = page_size_options()
+    if len(items) <= sizes[0]:
+        return items
+
+    col_size, col_page, _ = st.columns([1, 1, 2])
+    with col_size:
+        page_size = st.selectbox(
+            "Per page", sizes, index=sizes.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size"
+        )
+    pages = page_count(len(items), page_size)
+    with col_page:
+        page = st.selectbox(
+            "Page",
+            range(1, pages + 1),
+            format_func=lambda p: f"{p} of {pages}",
+            key=f"{key}_page",
+        )
+    return page_slice(items, page, page_size)
+
+
+def _result_caption(result: dict) -> str | None:
+    """Error message or timing summary shown under a result card."""
+    if result["label"] == "error":
+        return f"❌ {result['details'].get('error', 'Analysis failed')}"
+    return _timing_caption(result["details"])
+
+
+def _timing_caption(details: dict) -> str | None:
+    """One-line timing summary for a result card, if timings are known."""
+    if details.get("cache_hit"):
+        return "⚡ Cached result"
+    timings = details.get("timings_ms")
+    if not timings:
+        return None
+    ms = timings.get("decode", 0.0) + timings.get("model", 0.0) + timings.get("postprocess", 0.0)
+    caption = f"⏱️ {ms:.0f} ms · batch of {details.get('batch_size', 1)}"
+    if details.get("decided_by") == "screen":
+        caption += " · early exit"
+    return caption
 
 
 def _render_footer():
@@ -0,0 +1,30 @@
+"""
+Process-wide model loader shared by every Streamlit session.
+
+With ``SPOOF_REMOTE_URL`` set, predictions go to the HTTP inference
+service (`inference.server`) and no model is loaded in this process.
+"""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from inference.client import REMOTE_URL, RemoteClient, RemoteModelLoader
+from inference.runtime import ModelLoader
+
+
+@st.cache_resource(show_spinner=False)
+def get_model_loader() -> ModelLoader | RemoteModelLoader:
+    """Return the cached loader, starting the background load on first call."""
+    if REMOTE_URL:
+        return RemoteModelLoader(RemoteClient(REMOTE_URL)).start()
+    return ModelLoader().start()
+
+
+def get_predict_batch():
+    """`predict_batch` of the configured backend: remote service or in-process."""
+    if REMOTE_URL:
+        return RemoteClient(REMOTE_URL).predict_batch
+    from inference import predict_batch
+
+    return predict_batch
@@ -8,7 +8,7 @@ import streamlit as st
 def init_session_state():
     """Initialize all session state variables with defaults."""
     defaults = {
-        "uploaded_files": [],
+        "uploaded_files": [],  # [ImageHandle]
         "results": {},        # {filename: {"label": str, "confidence": float, "details": dict}}
         "is_processing": False,
         "processed_count": 0,
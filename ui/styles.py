@@ -175,6 +175,33 @@ def get_custom_css() -> str:
         font-family: 'JetBrains Mono', monospace !important;
     }
 
+    /* ── Card Grid ───────────────────────────────────────────── */
+    .card-row {
+        display: grid;
+        grid-template-columns: repeat(4, minmax(0, 1fr));
+        gap: 1rem;
+        margin-bottom: 1rem;
+    }
+
+    @media (max-width: 640px) {
+        .card-row { grid-template-columns: repeat(2, minmax(0, 1fr)); }
+    }
+
+    .card-caption {
+        margin-top: 0.5rem;
+        font-size: 0.75rem;
+        color: var(--text-muted);
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+    }
+
+    /* Error messages wrap instead of being cut off. */
+    .result-card.error .card-caption {
+        white-space: normal;
+        overflow-wrap: anywhere;
+    }
+
     /* ── Image Preview Cards ─────────────────────────────────── */
     .image-card {
         background: var(--gradient-card);
@@ -231,6 +258,11 @@ def get_custom_css() -> str:
         box-shadow: 0 0 20px rgba(239, 68, 68, 0.08);
     }
 
+    .result-card.error {
+        border-color: rgba(245, 158, 11, 0.4);
+        box-shadow: 0 0 20px rgba(245, 158, 11, 0.08);
+    }
+
     .result-header {
         padding: 0.8rem 1rem;
         display: flex;
@@ -240,6 +272,7 @@ def get_custom_css() -> str:
 
     .result-header.real { background: rgba(16, 185, 129, 0.08); }
     .result-header.spoof { background: rgba(239, 68, 68, 0.08); }
+    .result-header.error { background: rgba(245, 158, 11, 0.08); }
 
     .result-label {
         font-family: 'JetBrains Mono', monospace;
@@ -251,6 +284,7 @@ def get_custom_css() -> str:
 
     .result-label.real { color: var(--accent-green); }
     .result-label.spoof { color: var(--accent-red); }
+    .result-label.error { color: var(--accent-amber); }
 
     .result-confidence {
         font-family: 'JetBrains Mono', monospace;
@@ -333,6 +367,7 @@ def get_custom_css() -> str:
 
     .stat-chip.real-chip { border-color: rgba(16, 185, 129, 0.3); }
     .stat-chip.spoof-chip { border-color: rgba(239, 68, 68, 0.3); }
+    .stat-chip.error-chip { border-color: rgba(245, 158, 11, 0.3); }
 
     /* ── Analyze Button ──────────────────────────────────────── */
     .stButton > button {
@@ -0,0 +1,66 @@
+"""
+Downscaled, cached thumbnails for preview and result cards.
+
+Cards used to inline the full original bytes as base64 on every rerun.
+Thumbnails are produced by `ImageHandle.thumbnail` (decoded once, shrunk to
+`THUMBNAIL_MAX_EDGE`) and cached by content hash in a process-wide,
+size-bounded LRU, so the same image uploaded in another session is free.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from ui.image_utils import ImageHandle, file_to_base64, get_mime_type
+
+THUMBNAIL_CACHE_MB = int(os.environ.get("SPOOF_THUMBNAIL_CACHE_MB", "64"))
+
+
+class ThumbnailCache:
+    """Thread-safe LRU of (base64, mime) thumbnails bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: tuple[str, str]):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = entry
+            self._bytes += len(entry[0])
+            while len(self._entries) > 1 and self._bytes > self.max_bytes:
+                _, (b64, _) = self._entries.popitem(last=False)
+                self._bytes -= len(b64)
+
+
+@st.cache_resource(show_spinner=False)
+def _thumbnail_cache() -> ThumbnailCache:
+    return ThumbnailCache(THUMBNAIL_CACHE_MB * 1024 * 1024)
+
+
+def thumbnail_base64(handle: ImageHandle) -> tuple[str, str]:
+    """Return a cached (base64, mime) thumbnail for an uploaded image."""
+    cache = _thumbnail_cache()
+    entry = cache.get(handle.content_hash)
+    if entry is None:
+        try:
+            entry = handle.thumbnail()
+        except (OSError, ValueError):
+            # Undecodable upload: fall back to the original bytes.
+            entry = (file_to_base64(handle), get_mime_type(handle))
+        cache.put(handle.content_hash, entry)
+    return entry